@@ -1,12 +1,55 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict
+import asyncio
+import io
+import string
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List
+
+import orjson
 
 from app.agent.prompts import ANSWERER_SYSTEM, ANSWERER_USER_TEMPLATE
 from app.infra.http import OllamaCloudClient
 
 
+def _compile_template(template: str):
+    """
+    Pre-parsea el template en (literal, campo) una sola vez.
+    str.format() re-escanea los placeholders en cada llamada; esto lo evita.
+    """
+    parts = [(literal, field) for literal, field, _spec, _conv in string.Formatter().parse(template)]
+
+    def render(**kwargs: Any) -> str:
+        # Un solo buffer para todo el prompt: los campos dict/list se serializan
+        # directo adentro, sin armar strings JSON intermedios aparte del output.
+        buf = io.StringIO()
+        for literal, field in parts:
+            buf.write(literal)
+            if field is None:
+                continue
+            value = kwargs[field]
+            if isinstance(value, str):
+                buf.write(value)
+            else:
+                buf.write(orjson.dumps(value).decode("utf-8"))
+        return buf.getvalue()
+
+    return render
+
+
+_render_user_prompt = _compile_template(ANSWERER_USER_TEMPLATE)
+
+
+@dataclass
+class AnswerRequest:
+    message: str
+    intent: str
+    slots: Dict[str, Any]
+    tool_results: Dict[str, Any]
+    session_summary: str
+    request_id: str
+
+
 class LLMAnswerer:
     def __init__(self, client: OllamaCloudClient):
         self.client = client
@@ -20,12 +63,62 @@ class LLMAnswerer:
         session_summary: str,
         request_id: str,
     ) -> str:
-        user_prompt = ANSWERER_USER_TEMPLATE.format(
+        # Camino no-streaming por chat_text: conserva retries/backoff,
+        # LLMError, el coalescer de llamadas idénticas y el semáforo de
+        # concurrencia del cliente. answer_stream queda para callers que
+        # realmente consumen el stream (SSE/WebSocket).
+        user_prompt = _render_user_prompt(
             message=message,
             intent=intent,
-            slots_json=json.dumps(slots, ensure_ascii=False),
-            tool_results_json=json.dumps(tool_results, ensure_ascii=False),
+            slots_json=slots,
+            tool_results_json=tool_results,
             session_summary=session_summary,
         )
         # Answerer puede devolver texto normal (no JSON)
-        return await self.client.chat_text(system=ANSWERER_SYSTEM, user=user_prompt, request_id=request_id)
\ No newline at end of file
+        return await self.client.chat_text(system=ANSWERER_SYSTEM, user=user_prompt, request_id=request_id)
+
+    async def answer_batch(self, requests: List[AnswerRequest], max_concurrency: int = 4) -> List[str]:
+        """
+        Resuelve varias respuestas en paralelo (fan-out, ej: reconexión con
+        varias acciones pendientes). Un solo TLS handshake-pool y N prompts en
+        vuelo acotados por semáforo; el orden del resultado respeta el input.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _one(req: AnswerRequest) -> str:
+            async with sem:
+                return await self.answer(
+                    message=req.message,
+                    intent=req.intent,
+                    slots=req.slots,
+                    tool_results=req.tool_results,
+                    session_summary=req.session_summary,
+                    request_id=req.request_id,
+                )
+
+        return list(await asyncio.gather(*(_one(r) for r in requests)))
+
+    async def answer_stream(
+        self,
+        message: str,
+        intent: str,
+        slots: Dict[str, Any],
+        tool_results: Dict[str, Any],
+        session_summary: str,
+        request_id: str,
+    ) -> AsyncIterator[str]:
+        """
+        Igual que answer() pero va entregando el texto a medida que el modelo
+        genera (para SSE/WebSocket). Answerer puede devolver texto normal (no JSON).
+        """
+        user_prompt = _render_user_prompt(
+            message=message,
+            intent=intent,
+            slots_json=slots,
+            tool_results_json=tool_results,
+            session_summary=session_summary,
+        )
+        async for chunk in self.client.chat_text_stream(
+            system=ANSWERER_SYSTEM, user=user_prompt, request_id=request_id
+        ):
+            yield chunk
\ No newline at end of file
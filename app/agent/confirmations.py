@@ -1,19 +1,44 @@
 from __future__ import annotations
 
-import secrets
+import asyncio
+import heapq
 import time
+from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+from app.infra.utils import fast_token
+
+# Cantidad de shards (potencia de 2 para poder usar & como módulo)
+_NUM_SHARDS = 16
+
+
+@dataclass(slots=True)
+class Pending:
+    """Entrada pendiente compacta (~3x menos memoria que un dict por token)."""
+    session_id: str
+    tool_name: str
+    tool_args: Dict[str, Any]
+    created_at: int
+    expires_at: int
+
 
 class ConfirmationManager:
     """
     Maneja confirmaciones en 2 pasos para acciones write.
     Store simple en memoria. Se puede reemplazar por Redis/DB.
+
+    El estado se particiona en shards para que cleanup nunca recorra todo
+    el store de una vez (y pueda ceder el event loop entre shards).
     """
 
     def __init__(self, ttl_sec: int = 600):
         self.ttl_sec = ttl_sec
-        self._pending: dict[str, dict[str, Any]] = {}
+        self._shards: list[dict[str, Pending]] = [{} for _ in range(_NUM_SHARDS)]
+        # Heap de (expires_at, token) por shard: cleanup solo paga por lo vencido
+        self._heaps: list[list[tuple[int, str]]] = [[] for _ in range(_NUM_SHARDS)]
+
+    def _shard_idx(self, token: str) -> int:
+        return hash(token) & (_NUM_SHARDS - 1)
 
     def create(
         self,
@@ -27,54 +52,71 @@ class ConfirmationManager:
         ttl = max(ttl, 1)  # evita TTL 0 o negativo
 
         now = int(time.time())
-        token = secrets.token_urlsafe(16)
-
-        self._pending[token] = {
-            "session_id": session_id,
-            "tool_name": tool_name,
-            "tool_args": tool_args,
-            "created_at": now,
-            "expires_at": now + ttl,   # vencimiento absoluto
-        }
+        token = fast_token()
+
+        idx = self._shard_idx(token)
+        self._shards[idx][token] = Pending(
+            session_id=session_id,
+            tool_name=tool_name,
+            tool_args=tool_args,
+            created_at=now,
+            expires_at=now + ttl,   # vencimiento absoluto
+        )
+        heapq.heappush(self._heaps[idx], (now + ttl, token))
+
+        # Cleanup dirigido: un timer por token borra exactamente esa entrada al
+        # vencer, dejando al sweep periódico como red de seguridad (timers que
+        # murieron con el loop, etc.). Sin loop corriendo (tests/scripts) el
+        # sweep periódico sigue cubriendo todo.
+        try:
+            asyncio.get_running_loop().call_later(ttl, self._expire_one, token)
+        except RuntimeError:
+            pass
+
         return token
 
-    def consume(self, token: str, session_id: str) -> Optional[Dict[str, Any]]:
-        item = self._pending.get(token)
+    def _expire_one(self, token: str) -> None:
+        shard = self._shards[self._shard_idx(token)]
+        item = shard.get(token)
+        if item and item.expires_at <= int(time.time()):
+            shard.pop(token, None)
+
+    def consume(self, token: str, session_id: str) -> Optional[Pending]:
+        shard = self._shards[self._shard_idx(token)]
+        item = shard.get(token)
         if not item:
             return None
-        if item["session_id"] != session_id:
+        if item.session_id != session_id:
             return None
 
-        now = int(time.time())
-        expires_at = int(item.get("expires_at") or 0)
-
-        # ✅ compat: si no existe expires_at, usar created_at + ttl_sec
-        if expires_at:
-            if now > expires_at:
-                self._pending.pop(token, None)
-                return None
-        else:
-            if now - int(item["created_at"]) > self.ttl_sec:
-                self._pending.pop(token, None)
-                return None
-
-        self._pending.pop(token, None)
+        shard.pop(token, None)
+        if int(time.time()) > item.expires_at:
+            return None
         return item
 
     def cleanup(self) -> None:
         now = int(time.time())
-        expired = []
-        for k, v in self._pending.items():
-            expires_at = int(v.get("expires_at") or 0)
-            if expires_at:
-                if now > expires_at:
-                    expired.append(k)
-            else:
-                if now - int(v["created_at"]) > self.ttl_sec:
-                    expired.append(k)
-
-        for k in expired:
-            self._pending.pop(k, None)
+        for idx in range(_NUM_SHARDS):
+            self._cleanup_shard(idx, now)
+
+    async def cleanup_async(self) -> None:
+        # Igual que cleanup() pero cede el event loop entre shards, para que
+        # un sweep grande no congele a las demás coroutines.
+        now = int(time.time())
+        for idx in range(_NUM_SHARDS):
+            self._cleanup_shard(idx, now)
+            await asyncio.sleep(0)
+
+    def _cleanup_shard(self, idx: int, now: int) -> None:
+        # O(k log n) para k vencidos: pop del heap hasta que el head siga vivo.
+        # consume() deja entradas stale en el heap; se filtran acá comparando expires_at.
+        shard = self._shards[idx]
+        heap = self._heaps[idx]
+        while heap and heap[0][0] <= now:
+            exp, token = heapq.heappop(heap)
+            item = shard.get(token)
+            if item and item.expires_at == exp:
+                shard.pop(token, None)
 
 
 # ✅ SINGLETON (esto evita que se “pierdan” tokens entre requests)
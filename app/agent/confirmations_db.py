@@ -1,17 +1,69 @@
 from __future__ import annotations
 
-import json
 import secrets
+import time
 from typing import Any, Dict, Optional
 
+import orjson
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.infra.utils import fast_token
+
 
 def _gen_short_code() -> str:
     return f"{secrets.randbelow(1_000_000):06d}"  # 000000-999999
 
 
+def _lookup_column(token_or_code: str) -> str:
+    # Los tokens son urlsafe-b64 de 16 bytes (22 chars); los short codes son
+    # exactamente 6 dígitos. Elegir la columna acá deja al SELECT como point
+    # lookup sobre un único índice en vez de un index-merge por el OR.
+    return "short_code" if len(token_or_code) == 6 and token_or_code.isdigit() else "token"
+
+
+# Statements pre-armados por columna (set cerrado: no hay interpolación de input)
+_CONSUME_SQL = {
+    col: text(
+        f"""
+        UPDATE pending_confirmations
+        SET status='consumed', consumed_at=UTC_TIMESTAMP()
+        WHERE {col} = :v
+          AND session_id = :sid
+          AND status = 'pending'
+          AND (expires_at IS NULL OR expires_at >= UTC_TIMESTAMP())
+        """
+    )
+    for col in ("token", "short_code")
+}
+
+_EXPIRE_ON_MISS_SQL = {
+    col: text(
+        f"""
+        UPDATE pending_confirmations
+        SET status='expired'
+        WHERE {col} = :v
+          AND session_id = :sid
+          AND status = 'pending'
+          AND expires_at < UTC_TIMESTAMP()
+        """
+    )
+    for col in ("token", "short_code")
+}
+
+_FETCH_CONSUMED_SQL = {
+    col: text(
+        f"""
+        SELECT session_id, tool_name, tool_args_json
+        FROM pending_confirmations
+        WHERE {col} = :v AND session_id = :sid
+        LIMIT 1
+        """
+    )
+    for col in ("token", "short_code")
+}
+
+
 class MySQLConfirmationStore:
     def __init__(self, ttl_sec: int = 600):
         self.ttl_sec = ttl_sec
@@ -24,115 +76,135 @@ class MySQLConfirmationStore:
         tool_args: Dict[str, Any],
         ttl_sec: Optional[int] = None,
     ) -> Dict[str, str]:
-        token = secrets.token_urlsafe(16)
+        token = fast_token()
         ttl = int(ttl_sec or self.ttl_sec)
 
-        # Generar short_code y evitar colisiones
+        # INSERT optimista: el UNIQUE de short_code es el árbitro de colisiones.
+        # INSERT IGNORE y no ON DUPLICATE KEY UPDATE: los dialects MySQL de
+        # SQLAlchemy setean CLIENT.FOUND_ROWS, con lo cual un ODKU no-op
+        # reporta rowcount 1 y la colisión sería indistinguible de un insert
+        # exitoso. Con IGNORE el duplicado es rowcount 0, como en el mark()
+        # del dedupe store.
         short_code = None
-        for _ in range(10):
+        for _ in range(5):
             candidate = _gen_short_code()
-            exists = db.execute(
-                text("SELECT 1 FROM pending_confirmations WHERE short_code=:c LIMIT 1"),
-                {"c": candidate},
-            ).first()
-            if not exists:
+            res = db.execute(
+                text(
+                    """
+                    INSERT IGNORE INTO pending_confirmations
+                    (token, short_code, session_id, tool_name, tool_args_json, status, created_at, expires_at)
+                    VALUES
+                    (:token, :short_code, :session_id, :tool_name, :tool_args_json, 'pending', UTC_TIMESTAMP(),
+                     DATE_ADD(UTC_TIMESTAMP(), INTERVAL :ttl SECOND))
+                    """
+                ),
+                {
+                    "token": token,
+                    "short_code": candidate,
+                    "session_id": session_id,
+                    "tool_name": tool_name,
+                    "tool_args_json": orjson.dumps(tool_args).decode("utf-8"),
+                    "ttl": ttl,
+                },
+            )
+            db.commit()
+            if res.rowcount:  # 1 = fila insertada; 0 = colisión de short_code
                 short_code = candidate
                 break
 
-        # Si por alguna razón no conseguimos uno, seguimos sin short_code (no debería pasar)
-        db.execute(
-            text(
-                """
-                INSERT INTO pending_confirmations
-                (token, short_code, session_id, tool_name, tool_args_json, status, created_at, expires_at)
-                VALUES
-                (:token, :short_code, :session_id, :tool_name, :tool_args_json, 'pending', UTC_TIMESTAMP(),
-                 DATE_ADD(UTC_TIMESTAMP(), INTERVAL :ttl SECOND))
-                """
-            ),
-            {
-                "token": token,
-                "short_code": short_code,
-                "session_id": session_id,
-                "tool_name": tool_name,
-                "tool_args_json": json.dumps(tool_args, ensure_ascii=False),
-                "ttl": ttl,
-            },
-        )
-        db.commit()
+        if short_code is None:
+            # No conseguimos código único (no debería pasar): insertamos sin short_code
+            db.execute(
+                text(
+                    """
+                    INSERT INTO pending_confirmations
+                    (token, short_code, session_id, tool_name, tool_args_json, status, created_at, expires_at)
+                    VALUES
+                    (:token, NULL, :session_id, :tool_name, :tool_args_json, 'pending', UTC_TIMESTAMP(),
+                     DATE_ADD(UTC_TIMESTAMP(), INTERVAL :ttl SECOND))
+                    """
+                ),
+                {
+                    "token": token,
+                    "session_id": session_id,
+                    "tool_name": tool_name,
+                    "tool_args_json": orjson.dumps(tool_args).decode("utf-8"),
+                    "ttl": ttl,
+                },
+            )
+            db.commit()
 
         return {"token": token, "short_code": short_code or token}
 
     def consume(self, db: Session, token_or_code: str, session_id: str) -> Optional[Dict[str, Any]]:
-        # lock row (evita doble consumo)
-        row = db.execute(
-            text(
-                """
-                SELECT token, short_code, session_id, tool_name, tool_args_json, status, expires_at
-                FROM pending_confirmations
-                WHERE token = :v OR short_code = :v
-                FOR UPDATE
-                """
-            ),
-            {"v": token_or_code},
-        ).mappings().first()
-
-        if not row:
-            db.rollback()
-            return None
-
-        if row["session_id"] != session_id:
-            db.rollback()
-            return None
+        # Compare-and-set: un solo UPDATE condicional decide el doble consumo
+        # sin SELECT FOR UPDATE previo (no hay row-lock explícito que pueda
+        # encolar a un doble click / retry del webhook).
+        col = _lookup_column(token_or_code)
+        params = {"v": token_or_code, "sid": session_id}
 
-        if row["status"] != "pending":
-            db.rollback()
-            return None
+        res = db.execute(_CONSUME_SQL[col], params)
+        db.commit()
 
-        expires_at = row["expires_at"]
-        if expires_at is not None and expires_at < db.execute(text("SELECT UTC_TIMESTAMP()")).scalar_one():
-            db.execute(
-                text("UPDATE pending_confirmations SET status='expired' WHERE token=:token"),
-                {"token": row["token"]},
-            )
+        if (res.rowcount or 0) != 1:
+            # No disparó: marcar lazy el vencido (si lo era) y devolver None
+            db.execute(_EXPIRE_ON_MISS_SQL[col], params)
             db.commit()
             return None
 
-        # consumir
-        db.execute(
-            text(
-                """
-                UPDATE pending_confirmations
-                SET status='consumed', consumed_at=UTC_TIMESTAMP()
-                WHERE token=:token AND status='pending'
-                """
-            ),
-            {"token": row["token"]},
-        )
-        db.commit()
+        # Lectura sin lock del payload recién consumido
+        row = db.execute(_FETCH_CONSUMED_SQL[col], params).mappings().first()
 
-        raw_args = row["tool_args_json"]
-        if isinstance(raw_args, (bytes, bytearray)):
-            raw_args = raw_args.decode("utf-8", errors="replace")
+        if not row:
+            return None
 
+        # orjson.loads acepta bytes directamente (no hace falta decodificar antes)
         return {
             "session_id": row["session_id"],
             "tool_name": row["tool_name"],
-            "tool_args": json.loads(raw_args),
+            "tool_args": orjson.loads(row["tool_args_json"]),
         }
 
-    def cleanup_expired(self, db: Session) -> int:
-        res = db.execute(
-            text(
-                """
-                UPDATE pending_confirmations
-                SET status='expired'
-                WHERE status='pending' AND expires_at IS NOT NULL AND expires_at < UTC_TIMESTAMP()
-                """
+    def cleanup_expired(
+        self,
+        db: Session,
+        batch_size: int = 1000,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        # Lotes con LIMIT: un UPDATE gigante toma row-locks largos y bloquea
+        # los consume() concurrentes (FOR UPDATE). Acotamos cada statement y
+        # dormimos un poco entre lotes para no saturar el redo log.
+        total = 0
+        batches = 0
+        while True:
+            # SKIP LOCKED: el sweep saltea filas que un consume() tiene lockeadas
+            # en vez de encolarse detrás; las agarra el próximo lote.
+            res = db.execute(
+                text(
+                    """
+                    UPDATE pending_confirmations p
+                    JOIN (
+                        SELECT token
+                        FROM pending_confirmations
+                        WHERE status='pending' AND expires_at IS NOT NULL AND expires_at < UTC_TIMESTAMP()
+                        LIMIT :batch
+                        FOR UPDATE SKIP LOCKED
+                    ) s USING (token)
+                    SET p.status='expired'
+                    """
+                ),
+                {"batch": batch_size},
             )
-        )
-        db.commit()
-        return res.rowcount or 0
+            db.commit()
+            affected = res.rowcount or 0
+            total += affected
+            batches += 1
+            if affected < batch_size:
+                break
+            if max_batches is not None and batches >= max_batches:
+                break
+            time.sleep(0.05)
+        return total
 
 
 confirmations_store = MySQLConfirmationStore(ttl_sec=600)
\ No newline at end of file
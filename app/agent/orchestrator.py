@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Optional
+import asyncio
+import re
+from typing import Any, Dict, Mapping, Optional
+
+import orjson
 
 from app.settings import Settings
 from app.agent.schema import AgentResponse, UserMessage, PlannerOutput
@@ -11,18 +14,22 @@ from app.core.events import EventBus
 from app.core.logging import log_event
 from app.core.errors import ToolError
 from app.core.session_store import SessionStore
-from app.core.dedupe import DedupeStore
+from app.core.dedupe import BloomFilter, DedupeStore
 from app.plugins.registry import ToolRegistry
 from app.infra.http import OllamaCloudClient
 from app.infra.utils import new_request_id
 
-from app.infra.db import get_db_session
+from app.infra.db import get_autocommit_session, get_db_session
 from app.agent.confirmations_db import confirmations_store
-from app.core.rate_limit import MemoryFixedWindowLimiter
+from app.core.rate_limit import MemoryTokenBucketLimiter
 
 from app.infra.mailer import SMTPMailer
 
 
+# Guardrail de registro: una sola pasada de regex en vez de N búsquedas de
+# substring por mensaje. Cubre los mismos disparadores que la lista original.
+_REGISTER_RE = re.compile(r"(?:registrar|alta|crear)\s+(?:cliente|usuario)|nuevo\s+cliente")
+
 
 class AgentOrchestrator:
     def __init__(
@@ -39,11 +46,15 @@ class AgentOrchestrator:
         self.dedupe_store = dedupe_store
         self.event_bus = event_bus
 
-        # ✅ Rate limit por sesión (in-memory)
-        self.session_limiter = MemoryFixedWindowLimiter(
-            max_requests=settings.RATE_LIMIT_SESSION_MAX,
-            window_sec=settings.RATE_LIMIT_SESSION_WINDOW_SEC,
+        # ✅ Rate limit por sesión (in-memory, token bucket: sin burst 2x en
+        # el borde de ventana como pasaba con la ventana fija)
+        self.session_limiter = MemoryTokenBucketLimiter(
+            rate_per_sec=settings.RATE_LIMIT_SESSION_MAX / settings.RATE_LIMIT_SESSION_WINDOW_SEC,
+            burst=settings.RATE_LIMIT_SESSION_MAX,
         )
+        # Pre-tocar los shards del limiter: evita page-faults/re-hash en los
+        # primeros requests después de un arranque o idle largo
+        self.session_limiter.warmup()
 
         self.ollama = OllamaCloudClient(
             base_url=settings.OLLAMA_API_BASE,
@@ -51,15 +62,77 @@ class AgentOrchestrator:
             model=settings.OLLAMA_MODEL,
             timeout_sec=settings.OLLAMA_TIMEOUT_SEC,
             retries=settings.OLLAMA_RETRIES,
+            max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+            max_concurrent=settings.OLLAMA_MAX_CONCURRENT,
         )
         self.planner = LLMPlanner(self.ollama)
         self.answerer = LLMAnswerer(self.ollama)
         # ✅ Mailer (singleton)
         self.mailer = SMTPMailer(self.settings)
 
-    async def handle_message(self, msg: UserMessage, request_headers: Dict[str, str]) -> AgentResponse:
+        # Bloom local frente al dedupe store. Por defecto es solo un hint (el
+        # store siempre decide); con DEDUPE_TRUST_LOCAL_BLOOM (single-process)
+        # un miss saltea el round-trip y el mark persistente corre de fondo.
+        self._dedupe_bloom = BloomFilter(capacity=100_000, error_rate=0.001)
+        self._bg_tasks: set[asyncio.Task] = set()
+
+        # Cola de auditoría: el handler solo hace put_nowait; un flusher de
+        # fondo drena en lotes para que la I/O del writer no serialice requests.
+        self._event_q: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=10_000)
+        self._events_dropped = 0
+        self._flusher_task: Optional[asyncio.Task] = None
+
+    def _on_background_mark_done(self, task: asyncio.Task) -> None:
+        self._bg_tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            log_event("dedupe_mark_failed", error=str(exc))
+        elif task.result() is False:
+            # El bloom dejó pasar un duplicado que el store sí conocía
+            log_event("dedupe_late_duplicate")
+
+    def _emit_event(self, evt: Dict[str, Any]) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Sin event loop (scripts/tests sync): append directo
+            self.event_bus.append(evt)
+            return
+
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.get_running_loop().create_task(self._event_flusher())
+
+        try:
+            self._event_q.put_nowait(evt)
+        except asyncio.QueueFull:
+            self._events_dropped += 1
+
+    async def _event_flusher(self) -> None:
+        while True:
+            evt = await self._event_q.get()
+            batch = [evt]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._event_q.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await asyncio.to_thread(self.event_bus.append_batch, batch)
+            except Exception:
+                # auditoría best-effort: nunca rompe el flujo de requests
+                pass
+
+    async def handle_message(self, msg: UserMessage, request_headers: Mapping[str, str]) -> AgentResponse:
         request_id = new_request_id()
         session_id = msg.session_id or request_id
+
+        # Normalización única del mensaje: strip/lower se calculan una vez y
+        # se reusan (confirm-token, guardrails) en vez de re-alocar por paso.
+        msg_raw = msg.message or ""
+        msg_stripped = msg_raw.strip()
+        msg_low = msg_stripped.lower()
         if self.settings.RATE_LIMIT_ENABLED:
             res = self.session_limiter.check(f"sess:{session_id}")
             if not res.allowed:
@@ -71,26 +144,52 @@ class AgentOrchestrator:
                 )
 
         try:
-            # ✅ Dedupe (persistente/atómico via store)
+            # ✅ Dedupe (persistente/atómico via store, con bloom local delante)
             if msg.message_id:
                 provider = msg.channel or "unknown"
                 payload_hash = (request_headers or {}).get("x-payload-hash")
 
-                is_first = await self.dedupe_store.mark(
-                    provider=provider,
-                    message_id=msg.message_id,
-                    ttl_sec=self.settings.DEDUPE_TTL_SEC,
-                    payload_hash=payload_hash,
-                )
-                if not is_first:
-                    return AgentResponse(intent="unknown", reply="Mensaje duplicado (dedupe).", missing=[], data={})
+                bloom_key = f"{provider}:{msg.message_id}"
+                bloom_miss = bloom_key not in self._dedupe_bloom
+                if bloom_miss:
+                    self._dedupe_bloom.add(bloom_key)
+
+                if bloom_miss and self.settings.DEDUPE_TRUST_LOCAL_BLOOM:
+                    # Opt-in SOLO single-process: el bloom no tiene falsos
+                    # negativos dentro de este proceso, así que el mark
+                    # persistente corre de fondo. Un duplicado que este
+                    # proceso no vio (reinicio / otro worker) se procesaría
+                    # dos veces: por eso se loguea si el store lo reporta.
+                    task = asyncio.create_task(
+                        self.dedupe_store.mark(
+                            provider=provider,
+                            message_id=msg.message_id,
+                            ttl_sec=self.settings.DEDUPE_TTL_SEC,
+                            payload_hash=payload_hash,
+                        )
+                    )
+                    self._bg_tasks.add(task)
+                    task.add_done_callback(self._on_background_mark_done)
+                else:
+                    # Default: el store persistente siempre decide, también en
+                    # bloom miss — mantiene el dedupe entre workers/reinicios.
+                    # El bloom sigue ahorrando trabajo como pre-check barato
+                    # del webhook (seen() antes de HMAC/parse).
+                    is_first = await self.dedupe_store.mark(
+                        provider=provider,
+                        message_id=msg.message_id,
+                        ttl_sec=self.settings.DEDUPE_TTL_SEC,
+                        payload_hash=payload_hash,
+                    )
+                    if not is_first:
+                        return AgentResponse(intent="unknown", reply="Mensaje duplicado (dedupe).", missing=[], data={})
 
             # Load session
             session = await self.session_store.get(session_id) or {"history": [], "facts": {}}
             session_summary = self._summarize_session(session)
 
             # Audit IN
-            self.event_bus.append({
+            self._emit_event({
                 "type": "IN",
                 "request_id": request_id,
                 "session_id": session_id,
@@ -99,13 +198,18 @@ class AgentOrchestrator:
             })
             log_event("in", request_id=request_id, session_id=session_id, channel=msg.channel)
 
+            # Overlap: armar el catálogo de tools en un thread mientras el
+            # handler sigue con el shortcut de confirmación; se espera recién
+            # cuando el planner lo necesita.
+            catalog_task = asyncio.create_task(asyncio.to_thread(self.tool_registry.describe_tools))
+
             # 2-step confirmation shortcut: "confirm <token>" / "confirmar <token>"
-            maybe_token = self._extract_confirm_token(msg.message)
+            maybe_token = self._extract_confirm_token(msg_stripped, msg_low)
             if maybe_token:
-                pending = self._consume_confirmation(token=maybe_token, session_id=session_id)
+                pending = await self._consume_confirmation(token=maybe_token, session_id=session_id)
                 if not pending:
                     reply = "❌ Confirmación inválida o expirada. Volvé a solicitar la acción."
-                    return self._finalize(msg, session_id, request_id, intent="write_action", reply=reply, missing=[], data={})
+                    return await self._finalize(msg, session_id, request_id, session, intent="write_action", reply=reply, missing=[], data={})
 
                 tool_name = pending["tool_name"]
                 tool_args = pending["tool_args"]
@@ -113,8 +217,8 @@ class AgentOrchestrator:
                 result = await self._run_tool(tool_name, tool_args, msg, session_id, request_id, confirmed=True)
                 reply = self._format_write_result(tool_name, result)
 
-                return self._finalize(
-                    msg, session_id, request_id,
+                return await self._finalize(
+                    msg, session_id, request_id, session,
                     intent="write_action",
                     reply=reply,
                     missing=[],
@@ -122,8 +226,8 @@ class AgentOrchestrator:
                     debug={"confirmed": True, "tool": tool_name} if self._debug_enabled() else None,
                 )
 
-                        # Tools catalog
-            tools_catalog = self.tool_registry.describe_tools()
+            # Tools catalog (pre-armado arriba en paralelo)
+            tools_catalog = await catalog_task
 
             # Planner
             plan_dict = await self.planner.plan(
@@ -133,9 +237,13 @@ class AgentOrchestrator:
                 request_id=request_id,
             )
             plan = PlannerOutput.model_validate(plan_dict)
+            # Dumps únicos (mode=python evita la pasada de coerción JSON):
+            # se reutilizan en todos los branches de salida y debug
+            slots_dump = plan.slots.model_dump(mode="python")
+            plan_dump = plan.model_dump(mode="python")
 
             # ✅ Audit PLAN (log siempre, incluso si luego cortamos por guardrail)
-            self.event_bus.append({
+            self._emit_event({
                 "type": "PLAN",
                 "request_id": request_id,
                 "session_id": session_id,
@@ -148,24 +256,18 @@ class AgentOrchestrator:
             # -----------------------------
             # ✅ Guardrails robustos
             # -----------------------------
-            msg_low = (msg.message or "").lower()
-
-            wants_register_customer = any(
-                k in msg_low for k in [
-                    "registrar cliente",
-                    "alta cliente",
-                    "crear cliente",
-                    "nuevo cliente",
-                    "registrar usuario",
-                    "alta usuario",
-                    "crear usuario",
-                ]
-            )
+            # Si el planner ya enrutó a register_customer, el escaneo del
+            # guardrail no aporta nada: solo detecta "el planner se lo perdió".
+            first_tool = plan.tool_calls[0].name if plan.tool_calls else None
+            if first_tool == "register_customer":
+                wants_register_customer = False
+            else:
+                wants_register_customer = bool(_REGISTER_RE.search(msg_low))
 
             # 1) Si el usuario pide registrar cliente/usuario -> debe haber tool_calls
             if wants_register_customer and not plan.tool_calls:
-                return self._finalize(
-                    msg, session_id, request_id,
+                return await self._finalize(
+                    msg, session_id, request_id, session,
                     intent="error",
                     reply=(
                         "⚠️ Para registrar un cliente/usuario necesito ejecutar una herramienta y no se generó ninguna.\n"
@@ -173,16 +275,16 @@ class AgentOrchestrator:
                         "registrar cliente | display_name=Nombre Apellido | email=mail@dominio.com | phone=+54..."
                     ),
                     missing=[],
-                    data={"slots": plan.slots.model_dump(), "plan": plan.model_dump()},
-                    debug={"plan": plan.model_dump()} if self._debug_enabled() else None,
+                    data={"slots": slots_dump, "plan": plan_dump},
+                    debug={"plan": plan_dump} if self._debug_enabled() else None,
                 )
 
             # 2) Si el usuario pidió registrar y hay tool_calls, asegurá que use register_customer si existe
             if wants_register_customer and plan.tool_calls:
                 first = plan.tool_calls[0].name
                 if first != "register_customer" and self.tool_registry.get("register_customer"):
-                    return self._finalize(
-                        msg, session_id, request_id,
+                    return await self._finalize(
+                        msg, session_id, request_id, session,
                         intent="error",
                         reply=(
                             "⚠️ Para registrar clientes debe usarse la herramienta register_customer.\n"
@@ -190,22 +292,22 @@ class AgentOrchestrator:
                             "registrar cliente | display_name=Nombre Apellido | email=mail@dominio.com | phone=+54..."
                         ),
                         missing=[],
-                        data={"slots": plan.slots.model_dump(), "plan": plan.model_dump()},
-                        debug={"plan": plan.model_dump()} if self._debug_enabled() else None,
+                        data={"slots": slots_dump, "plan": plan_dump},
+                        debug={"plan": plan_dump} if self._debug_enabled() else None,
                     )
 
             # 3) Regla general: write_action siempre requiere tool_calls (sin importar texto)
             if plan.intent == "write_action" and not plan.tool_calls:
-                return self._finalize(
-                    msg, session_id, request_id,
+                return await self._finalize(
+                    msg, session_id, request_id, session,
                     intent="error",
                     reply=(
                         "⚠️ Para ejecutar una acción de escritura necesito llamar una herramienta, "
                         "pero no se generó ninguna."
                     ),
                     missing=[],
-                    data={"slots": plan.slots.model_dump(), "plan": plan.model_dump()},
-                    debug={"plan": plan.model_dump()} if self._debug_enabled() else None,
+                    data={"slots": slots_dump, "plan": plan_dump},
+                    debug={"plan": plan_dump} if self._debug_enabled() else None,
                 )
 
             # -----------------------------
@@ -213,39 +315,32 @@ class AgentOrchestrator:
             # -----------------------------
             if plan.missing:
                 reply = self._ask_for_missing(plan.missing)
-                return self._finalize(
-                    msg, session_id, request_id,
+                return await self._finalize(
+                    msg, session_id, request_id, session,
                     intent=plan.intent,
                     reply=reply,
                     missing=list(plan.missing),
-                    data={"slots": plan.slots.model_dump()},
-                    debug={"plan": plan_dict} if self._debug_enabled() else None,
+                    data={"slots": slots_dump},
+                    debug={"plan": plan_dump} if self._debug_enabled() else None,
                 )
 
             # If final (no tools needed)
             # ✅ Permitimos final SOLO si NO es una acción de escritura y no hay tools
+            # (el guardrail 3 ya cortó write_action sin tool_calls, así que acá
+            # un solo branch alcanza)
             if plan.final and not plan.tool_calls and plan.intent != "write_action":
-                return self._finalize(
-                    msg, session_id, request_id,
-                    intent=plan.intent,
-                    reply=plan.final,
-                    missing=[],
-                    data={"slots": plan.slots.model_dump()},
-                    debug={"plan": plan_dict} if self._debug_enabled() else None,
-                )
-
-            # If final (no tools needed)
-            if plan.final and not plan.tool_calls:
-                return self._finalize(
-                    msg, session_id, request_id,
+                return await self._finalize(
+                    msg, session_id, request_id, session,
                     intent=plan.intent,
                     reply=plan.final,
                     missing=[],
-                    data={"slots": plan.slots.model_dump()},
-                    debug={"plan": plan_dict} if self._debug_enabled() else None,
+                    data={"slots": slots_dump},
+                    debug={"plan": plan_dump} if self._debug_enabled() else None,
                 )
 
-            # Execute tools sequentially (allowlist enforced by registry)
+            # Execute tools (allowlist enforced by registry)
+            # Primero detectamos writes: la primera acción write corta a
+            # confirmación sin ejecutar lecturas cuyo resultado se descartaría.
             tool_results: Dict[str, Any] = {}
             for tc in plan.tool_calls:
                 tool = self.tool_registry.get(tc.name)
@@ -253,8 +348,9 @@ class AgentOrchestrator:
                     raise ToolError(f"Tool not found: {tc.name}")
 
                 # Write -> requires confirmation (persistida en MySQL)
-                if "write" in tool.scopes:
-                    conf = self._create_confirmation(
+                # (_requires_confirmation lo precalcula el registry al registrar)
+                if getattr(tool, "_requires_confirmation", None) or "write" in tool.scopes:
+                    conf = await self._create_confirmation(
                         session_id=session_id,
                         tool_name=tc.name,
                         tool_args=tc.args,
@@ -264,8 +360,8 @@ class AgentOrchestrator:
 
                     reply = self._format_confirmation_prompt(tc.name, tc.args, code)
 
-                    return self._finalize(
-                        msg, session_id, request_id,
+                    return await self._finalize(
+                        msg, session_id, request_id, session,
                         intent=plan.intent,
                         reply=reply,
                         missing=[],
@@ -276,18 +372,41 @@ class AgentOrchestrator:
                                 "tool": tc.name,
                             }
                         },
-                        debug={"plan": plan_dict} if self._debug_enabled() else None,
+                        debug={"plan": plan_dump} if self._debug_enabled() else None,
                     )
 
-                result = await self._run_tool(tc.name, tc.args, msg, session_id, request_id, confirmed=False)
-                tool_results[tc.name] = result
+            # Solo lecturas: son independientes, se ejecutan en paralelo con
+            # fan-out acotado para no agotar el pool de DB.
+            if plan.tool_calls:
+                sem = asyncio.Semaphore(self.settings.TOOL_CONCURRENCY_LIMIT)
+
+                async def _run_read(tc):
+                    async with sem:
+                        return await self._run_tool(
+                            tc.name, tc.args, msg, session_id, request_id, confirmed=False
+                        )
+
+                results = await asyncio.gather(
+                    *(_run_read(tc) for tc in plan.tool_calls),
+                    return_exceptions=True,
+                )
+                for tc, result in zip(plan.tool_calls, results):
+                    if isinstance(result, BaseException):
+                        # _run_tool ya auditó el error; propagamos como antes
+                        raise result
+                    tool_results[tc.name] = result
 
             # Answerer (optional)
-            if self.settings.ENABLE_ANSWERER:
+            # Fast path: si el planner ya trajo un final utilizable con buena
+            # confianza, reutilizarlo ahorra el segundo round-trip de LLM.
+            # (Acá ya no hay writes: la primera write cortó a confirmación.)
+            if plan.final and plan.confidence >= self.settings.SKIP_ANSWERER_CONFIDENCE:
+                reply = plan.final
+            elif self.settings.ENABLE_ANSWERER:
                 reply = await self.answerer.answer(
                     message=msg.message,
                     intent=plan.intent,
-                    slots=plan.slots.model_dump(),
+                    slots=slots_dump,
                     tool_results=tool_results,
                     session_summary=session_summary,
                     request_id=request_id,
@@ -295,18 +414,18 @@ class AgentOrchestrator:
             else:
                 reply = self._fallback_reply(plan.intent, tool_results)
 
-            return self._finalize(
-                msg, session_id, request_id,
+            return await self._finalize(
+                msg, session_id, request_id, session,
                 intent=plan.intent,
                 reply=reply,
                 missing=[],
-                data={"slots": plan.slots.model_dump(), "tool_results": tool_results},
-                debug={"plan": plan_dict, "tool_results": tool_results} if self._debug_enabled() else None,
+                data={"slots": slots_dump, "tool_results": tool_results},
+                debug={"plan": plan_dump, "tool_results": tool_results} if self._debug_enabled() else None,
             )
 
         except Exception as e:
             # ✅ Audit ERROR (append-only)
-            self.event_bus.append({
+            self._emit_event({
                 "type": "ERROR",
                 "request_id": request_id,
                 "session_id": session_id,
@@ -324,26 +443,35 @@ class AgentOrchestrator:
                 debug={"error": str(e)} if self._debug_enabled() else None,
             )
 
-    def _create_confirmation(self, session_id: str, tool_name: str, tool_args: Dict[str, Any]) -> Dict[str, str]:
-        db = get_db_session()
-        try:
-            return confirmations_store.create(
-                db,
-                session_id=session_id,
-                tool_name=tool_name,
-                tool_args=tool_args,
-                ttl_sec=self.settings.CONFIRMATION_TTL_SEC,
-            )
-        finally:
-            db.close()
+    async def _create_confirmation(self, session_id: str, tool_name: str, tool_args: Dict[str, Any]) -> Dict[str, str]:
+        # SQLAlchemy sync bloquearía el event loop por todo el roundtrip:
+        # se despacha a un thread. La sesión AUTOCOMMIT evita además el
+        # roundtrip del COMMIT explícito (consume() sí es transaccional).
+        def _do() -> Dict[str, str]:
+            db = get_autocommit_session()
+            try:
+                return confirmations_store.create(
+                    db,
+                    session_id=session_id,
+                    tool_name=tool_name,
+                    tool_args=tool_args,
+                    ttl_sec=self.settings.CONFIRMATION_TTL_SEC,
+                )
+            finally:
+                db.close()
 
-    def _consume_confirmation(self, token: str, session_id: str) -> Optional[Dict[str, Any]]:
-        db = get_db_session()
-        try:
-            # ✅ consume acepta token largo o short_code
-            return confirmations_store.consume(db, token_or_code=token, session_id=session_id)
-        finally:
-            db.close()
+        return await asyncio.to_thread(_do)
+
+    async def _consume_confirmation(self, token: str, session_id: str) -> Optional[Dict[str, Any]]:
+        def _do() -> Optional[Dict[str, Any]]:
+            db = get_db_session()
+            try:
+                # ✅ consume acepta token largo o short_code
+                return confirmations_store.consume(db, token_or_code=token, session_id=session_id)
+            finally:
+                db.close()
+
+        return await asyncio.to_thread(_do)
 
     async def _run_tool(
         self,
@@ -358,7 +486,10 @@ class AgentOrchestrator:
         if not tool:
             raise ToolError(f"Tool not found: {name}")
 
-        parsed = tool.input_model.model_validate(args)
+        # El registry compila un TypeAdapter por tool; validate_python entra
+        # directo al core sin el wrapping de model_validate
+        adapter = getattr(tool, "_args_adapter", None)
+        parsed = adapter.validate_python(args) if adapter is not None else tool.input_model.model_validate(args)
 
         ctx = {
             "request_id": request_id,
@@ -377,7 +508,7 @@ class AgentOrchestrator:
             out = await tool.run(parsed, ctx)
 
             # ✅ TOOL (resultado) — 1 solo evento por tool
-            self.event_bus.append({
+            self._emit_event({
                 "type": "TOOL",
                 "request_id": request_id,
                 "session_id": session_id,
@@ -392,7 +523,7 @@ class AgentOrchestrator:
             return out
 
         except Exception as e:
-            self.event_bus.append({
+            self._emit_event({
                 "type": "ERROR",
                 "request_id": request_id,
                 "session_id": session_id,
@@ -405,22 +536,24 @@ class AgentOrchestrator:
             raise
 
 
-    def _finalize(
+    async def _finalize(
         self,
         msg: UserMessage,
         session_id: str,
         request_id: str,
+        session: Dict[str, Any],
         intent: str,
         reply: str,
         missing: list[str],
         data: Dict[str, Any],
         debug: Optional[Dict[str, Any]] = None,
     ) -> AgentResponse:
-        session = self.session_store.get_sync(session_id) or {"history": [], "facts": {}}
+        # La sesión ya viene cargada de handle_message: mutamos y escribimos
+        # una sola vez, sin el segundo GET sync que bloqueaba el event loop.
         session["history"].append({"in": msg.message, "out": reply, "intent": intent})
-        self.session_store.set_sync(session_id, session)
+        await self.session_store.set(session_id, session)
 
-        self.event_bus.append({
+        self._emit_event({
             "type": "OUT",
             "request_id": request_id,
             "session_id": session_id,
@@ -446,7 +579,7 @@ class AgentOrchestrator:
         return "Me falta un dato para ayudarte:\n" + "\n".join(questions)
 
     def _fallback_reply(self, intent: str, tool_results: Dict[str, Any]) -> str:
-        return f"Intent: {intent}\nResultados: {json.dumps(tool_results, ensure_ascii=False)}"
+        return f"Intent: {intent}\nResultados: {orjson.dumps(tool_results).decode('utf-8')}"
 
     def _summarize_session(self, session: Dict[str, Any]) -> str:
         history = session.get("history", [])
@@ -459,13 +592,10 @@ class AgentOrchestrator:
             lines.append(f"  OUT: {h.get('out','')}")
         return "\n".join(lines)
 
-    def _extract_confirm_token(self, text: str) -> Optional[str]:
-        raw = text.strip()
-        low = raw.lower()
-        if low.startswith("confirm "):
-            return raw.split(" ", 1)[1].strip()
-        if low.startswith("confirmar "):
-            return raw.split(" ", 1)[1].strip()
+    def _extract_confirm_token(self, stripped: str, low: str) -> Optional[str]:
+        # Recibe el mensaje ya normalizado (strip/lower) desde handle_message
+        if low.startswith("confirm ") or low.startswith("confirmar "):
+            return stripped.split(" ", 1)[1].strip()
         return None
 
     def _format_write_result(self, tool_name: str, result: Dict[str, Any]) -> str:
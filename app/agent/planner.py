@@ -1,18 +1,30 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
 from typing import Any, Dict
 
+import orjson
+
 from app.agent.prompts import PLANNER_SYSTEM, PLANNER_USER_TEMPLATE, REPAIR_SYSTEM
-from app.agent.validators import parse_json_strict, validate_planner_output
+from app.agent.validators import validate_planner_json
 from app.core.errors import LLMError
 from app.infra.http import OllamaCloudClient
 from app.agent.schema import PlannerOutput
 
+# El schema del planner es inmutable por proceso: construirlo (y serializarlo
+# para el prompt de repair) una sola vez en vez de por request.
+_PLANNER_SCHEMA = PlannerOutput.model_json_schema()
+_PLANNER_SCHEMA_JSON = orjson.dumps(_PLANNER_SCHEMA).decode("utf-8")
+
 
 class LLMPlanner:
     def __init__(self, client: OllamaCloudClient):
         self.client = client
+        # Coalescer de llamadas en vuelo: ante doble-tap / retry del webhook
+        # que pasó la ventana del dedupe, ambos callers comparten un Future
+        # y se paga UNA sola llamada LLM.
+        self._inflight: Dict[str, asyncio.Future] = {}
 
     async def plan(
         self,
@@ -20,6 +32,42 @@ class LLMPlanner:
         session_summary: str,
         tools_catalog: str,
         request_id: str,
+    ) -> Dict[str, Any]:
+        key = hashlib.blake2b(
+            f"{message}|{session_summary}|{tools_catalog}".encode("utf-8"),
+            digest_size=16,
+        ).hexdigest()
+
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await self._plan_uncoalesced(
+                message=message,
+                session_summary=session_summary,
+                tools_catalog=tools_catalog,
+                request_id=request_id,
+            )
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            # Evitar "exception was never retrieved" si nadie más esperaba
+            if fut.done() and fut.exception() is not None:
+                fut.exception()
+
+    async def _plan_uncoalesced(
+        self,
+        message: str,
+        session_summary: str,
+        tools_catalog: str,
+        request_id: str,
     ) -> Dict[str, Any]:
         user_prompt = PLANNER_USER_TEMPLATE.format(
             message=message,
@@ -27,35 +75,19 @@ class LLMPlanner:
             tools_catalog=tools_catalog,
         )
 
-        # ✅ Structured outputs: schema Pydantic -> JSON schema
-        planner_schema = PlannerOutput.model_json_schema()
-
         raw_text = await self.client.chat_json(
             system=PLANNER_SYSTEM,
             user=user_prompt,
             request_id=request_id,
-            format_schema=planner_schema,
+            format_schema=_PLANNER_SCHEMA,
         )
 
-        # 1) parse JSON estricto
-        try:
-            obj = parse_json_strict(raw_text)
-        except Exception:
-            # repair 1 vez: pedir JSON válido (idealmente ajustado al schema)
-            repaired = await self._repair(raw_text, request_id=request_id, schema=planner_schema)
-            obj = parse_json_strict(repaired)
-
-        # 2) validar contra modelo Pydantic (reglas y tipos)
-        model, err = validate_planner_output(obj)
+        # Parse + validación en una sola pasada (TypeAdapter.validate_json)
+        model, err = validate_planner_json(raw_text)
         if err:
-            # repair 1 vez si no pasa schema
-            repaired = await self._repair(
-                json.dumps(obj, ensure_ascii=False),
-                request_id=request_id,
-                schema=planner_schema,
-            )
-            obj2 = parse_json_strict(repaired)
-            model2, err2 = validate_planner_output(obj2)
+            # repair 1 vez: pedir JSON válido ajustado al schema
+            repaired = await self._repair(raw_text, request_id=request_id, schema=_PLANNER_SCHEMA)
+            model2, err2 = validate_planner_json(repaired)
             if err2:
                 raise LLMError(f"Planner output invalid after repair: {err2}")
             return model2.model_dump()
@@ -67,7 +99,8 @@ class LLMPlanner:
         1 solo intento de repair.
         Incluimos el schema para forzar forma exacta.
         """
-        schema_compact = json.dumps(schema, ensure_ascii=False)
+        # Para el schema del planner reutilizamos el dump precalculado
+        schema_compact = _PLANNER_SCHEMA_JSON if schema is _PLANNER_SCHEMA else orjson.dumps(schema).decode("utf-8")
         prompt = (
             "Tu tarea: devolver SOLO un JSON válido, sin markdown, sin texto extra.\n"
             "Debe ajustarse EXACTAMENTE al siguiente JSON Schema:\n"
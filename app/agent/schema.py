@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 
 
 class AgentRequest(BaseModel):
@@ -56,4 +56,8 @@ class AgentResponse(BaseModel):
     reply: str
     missing: List[str] = Field(default_factory=list)
     data: Dict[str, Any] = Field(default_factory=dict)
-    debug: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    debug: Optional[Dict[str, Any]] = None
+
+# Adapter compilado una sola vez: validate_python/validate_json entran directo
+# al core en Rust, sin el dispatch de model_validate por llamada.
+PLANNER_OUTPUT_ADAPTER: TypeAdapter[PlannerOutput] = TypeAdapter(PlannerOutput)
@@ -1,19 +1,34 @@
 from __future__ import annotations
 
-import json
 from typing import Any, Dict, Tuple
 
+import orjson
 from pydantic import ValidationError
 
-from app.agent.schema import PlannerOutput
+from app.agent.schema import PLANNER_OUTPUT_ADAPTER, PlannerOutput
+
+# El adapter compilado vive en schema.py (compartido con tests y callers):
+# validate_json parsea y valida en una sola pasada (Rust), sin materializar
+# el dict intermedio de json.loads.
+_PLANNER_ADAPTER = PLANNER_OUTPUT_ADAPTER
 
 
 def parse_json_strict(text: str) -> Dict[str, Any]:
     """
     Parse estricto: esperamos que text sea JSON (objeto) sin markdown.
     """
-    text = text.strip()
-    return json.loads(text)
+    return orjson.loads(text.strip())
+
+
+def validate_planner_json(raw: str | bytes) -> Tuple[PlannerOutput, None | str]:
+    """
+    Parse + validación en un solo paso. Devuelve (model, error_message).
+    """
+    try:
+        model = _PLANNER_ADAPTER.validate_json(raw)
+        return model, None
+    except ValidationError as e:
+        return None, str(e)
 
 
 def validate_planner_output(obj: Dict[str, Any]) -> Tuple[PlannerOutput, None | str]:
@@ -21,7 +36,7 @@ def validate_planner_output(obj: Dict[str, Any]) -> Tuple[PlannerOutput, None |
     Valida contra Pydantic. Devuelve (model, error_message).
     """
     try:
-        model = PlannerOutput.model_validate(obj)
+        model = _PLANNER_ADAPTER.validate_python(obj)
         return model, None
     except ValidationError as e:
-        return None, str(e)
\ No newline at end of file
+        return None, str(e)
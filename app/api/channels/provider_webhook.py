@@ -1,42 +1,17 @@
 from __future__ import annotations
 
-import json
 import time
+
+import orjson
 from fastapi import APIRouter, Header, HTTPException, Request
 
-from app.agent.orchestrator import AgentOrchestrator
 from app.agent.schema import AgentResponse, UserMessage
 from app.core.security import verify_webhook_signature
-from app.core.events import EventBus
-from app.core.session_store_mysql import MySQLSessionStore
-
-from app.core.dedupe_mysql import MySQLDedupeStore, sha256_payload
-from app.plugins.registry import ToolRegistry
+from app.core.dedupe_mysql import sha256_payload
 from app.settings import settings
 
-from app.core.audit_writer_mysql import MySQLAuditWriter
-from app.core.events import EventBus
-
-
-
-
 router = APIRouter()
 
-event_bus = EventBus(writer=MySQLAuditWriter())
-
-session_store = MySQLSessionStore(ttl_sec=settings.SESSION_TTL_SEC)
-
-dedupe_store = MySQLDedupeStore(ttl_sec_default=settings.DEDUPE_TTL_SEC)
-tool_registry = ToolRegistry.from_settings(settings)
-
-orchestrator = AgentOrchestrator(
-    settings=settings,
-    tool_registry=tool_registry,
-    session_store=session_store,
-    dedupe_store=dedupe_store,
-    event_bus=event_bus,
-)
-
 
 @router.post("/provider/inbound", response_model=AgentResponse)
 async def provider_inbound(
@@ -44,13 +19,27 @@ async def provider_inbound(
     provider_signature: str = Header(default="", alias="provider-signature"),
     provider_timestamp: str = Header(default="", alias="provider-timestamp"),
 ):
-    raw_bytes = await request.body()
+    provider = "provider_webhook"
 
-    # ✅ Límite de tamaño del body (evita payloads gigantes / abuso)
-    if len(raw_bytes) > 256_000:  # 256 KB
-        raise HTTPException(status_code=413, detail="Payload too large")
+    # ✅ Dedupe ANTES del trabajo caro: si el proveedor manda un id de mensaje
+    # por header, un retry ya visto se corta acá sin pagar HMAC ni parse JSON.
+    idem_key = request.headers.get("idempotency-key") or request.headers.get("provider-message-id")
+    if idem_key and await request.app.state.orchestrator.dedupe_store.seen(provider, idem_key):
+        return AgentResponse(intent="unknown", reply="Mensaje duplicado (dedupe).", missing=[], data={})
+
+    # ✅ Límite de tamaño del body (evita payloads gigantes / abuso):
+    # se lee en streaming y se corta apenas se excede, sin bufferear todo
+    total = 0
+    chunks = []
+    async for chunk in request.stream():
+        total += len(chunk)
+        if total > 256_000:  # 256 KB
+            raise HTTPException(status_code=413, detail="Payload too large")
+        chunks.append(chunk)
+    raw_bytes = b"".join(chunks)
 
     # ✅ Anti-replay genérico por timestamp (si viene)
+    ts = None
     if provider_timestamp:
         try:
             ts = int(provider_timestamp)
@@ -74,13 +63,15 @@ async def provider_inbound(
             timestamp=provider_timestamp,
             secret=settings.WEBHOOK_SECRET,
             replay_window_sec=settings.WEBHOOK_REPLAY_WINDOW_SEC,
+            parsed_ts=ts,  # ya validado arriba: no re-parsear el header
         )
         if not ok:
             raise HTTPException(status_code=401, detail="Invalid signature")
 
     # Parse JSON
     try:
-        payload = json.loads(raw_bytes.decode("utf-8"))
+        # orjson acepta bytes: ahorra el decode utf-8 previo
+        payload = orjson.loads(raw_bytes)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON")
 
@@ -89,14 +80,14 @@ async def provider_inbound(
 
     from_id = str(payload.get("from", "")).strip() or None
 
-    incoming_id = payload.get("message_id") or payload.get("id")
+    # El id del header (si vino) manda, así el pre-check de arriba y el mark
+    # del orchestrator usan la misma key
+    incoming_id = idem_key or payload.get("message_id") or payload.get("id")
     message_id = str(incoming_id) if incoming_id else sha256_payload(raw_bytes)
 
     if not text:
         raise HTTPException(status_code=400, detail="Missing message")
 
-    provider = "provider_webhook"
-
     msg = UserMessage(
         message=text,
         session_id=from_id or "provider_session",
@@ -107,7 +98,7 @@ async def provider_inbound(
     )
 
     # ✅ Pasamos hash del body al orchestrator para guardarlo en dedupe_messages
-    headers = dict(request.headers)
-    headers["x-payload-hash"] = sha256_payload(raw_bytes)
+    # (solo la key que el orchestrator lee: evita materializar el multidict entero)
+    headers = {"x-payload-hash": sha256_payload(raw_bytes)}
 
-    return await orchestrator.handle_message(msg, request_headers=headers)
\ No newline at end of file
+    return await request.app.state.orchestrator.handle_message(msg, request_headers=headers)
\ No newline at end of file
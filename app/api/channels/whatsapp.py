@@ -2,29 +2,11 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Header, HTTPException, Request
 
-from app.agent.orchestrator import AgentOrchestrator
 from app.agent.schema import WAAgentRequest, AgentResponse, UserMessage
-from app.core.events import EventBus
-from app.core.session_store_mysql import MySQLSessionStore
-from app.core.dedupe import MemoryDedupeStore
-from app.plugins.registry import ToolRegistry
 from app.settings import settings
 
 router = APIRouter()
 
-event_bus = EventBus()
-session_store = MySQLSessionStore(ttl_sec=settings.SESSION_TTL_SEC)
-dedupe_store = MemoryDedupeStore(ttl_sec=settings.DEDUPE_TTL_SEC)
-tool_registry = ToolRegistry.from_settings(settings)
-
-orchestrator = AgentOrchestrator(
-    settings=settings,
-    tool_registry=tool_registry,
-    session_store=session_store,
-    dedupe_store=dedupe_store,
-    event_bus=event_bus,
-)
-
 
 @router.post("/wa/agent", response_model=AgentResponse)
 async def wa_agent_endpoint(
@@ -46,4 +28,6 @@ async def wa_agent_endpoint(
         message_id=payload.message_id,
         raw=payload.model_dump(),
     )
-    return await orchestrator.handle_message(msg, request_headers=dict(request.headers))
\ No newline at end of file
+    # Orchestrator único construido en el lifespan (app.state)
+    # Headers de Starlette ya es un Mapping: no hace falta copiarlo a dict
+    return await request.app.state.orchestrator.handle_message(msg, request_headers=request.headers)
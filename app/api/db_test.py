@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter
 from sqlalchemy import text
-from sqlalchemy.orm import Session
-from app.infra.db import get_db
+
+from app.infra.db import get_async_db_session
 
 router = APIRouter()
 
+
 @router.get("/db-test")
-def db_test(db: Session = Depends(get_db)):
-    v = db.execute(text("SELECT 1")).scalar()
-    return {"ok": True, "value": v}
\ No newline at end of file
+async def db_test():
+    # Async para no bloquear el event loop ni siquiera por un SELECT 1
+    db = get_async_db_session()
+    try:
+        v = (await db.execute(text("SELECT 1"))).scalar()
+        return {"ok": True, "value": v}
+    finally:
+        await db.close()
@@ -1,21 +1,15 @@
-from fastapi import APIRouter
-from app.infra.http import OllamaCloudClient
-from app.settings import settings
+from fastapi import APIRouter, Request
 
 router = APIRouter()
 
+
 @router.get("/llm-test")
-async def llm_test():
-    client = OllamaCloudClient(
-        base_url=settings.OLLAMA_API_BASE,
-        api_key=settings.OLLAMA_API_KEY,
-        model=settings.OLLAMA_MODEL,
-        timeout_sec=settings.OLLAMA_TIMEOUT_SEC,
-        retries=settings.OLLAMA_RETRIES,
-    )
+async def llm_test(request: Request):
+    # Reusa el cliente pooled del orchestrator: no renegocia TLS por llamada
+    client = request.app.state.orchestrator.ollama
     out = await client.chat_text(
         system="Respondé exactamente: OK",
         user="Hola",
         request_id="llm-test",
     )
-    return {"ok": True, "output": out}
\ No newline at end of file
+    return {"ok": True, "output": out}
@@ -1,25 +1,17 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from pydantic import BaseModel
 
-from app.settings import settings
-from app.infra.http import OllamaCloudClient
-from app.agent.planner import LLMPlanner
-
 router = APIRouter()
 
+
 class PlannerTestIn(BaseModel):
     message: str
 
+
 @router.post("/planner-test")
-async def planner_test(body: PlannerTestIn):
-    client = OllamaCloudClient(
-        base_url=settings.OLLAMA_API_BASE,
-        api_key=settings.OLLAMA_API_KEY,
-        model=settings.OLLAMA_MODEL,
-        timeout_sec=settings.OLLAMA_TIMEOUT_SEC,
-        retries=settings.OLLAMA_RETRIES,
-    )
-    planner = LLMPlanner(client)
+async def planner_test(body: PlannerTestIn, request: Request):
+    # Reusa el planner (y su cliente pooled) del orchestrator
+    planner = request.app.state.orchestrator.planner
 
     plan = await planner.plan(
         message=body.message,
@@ -27,4 +19,4 @@ async def planner_test(body: PlannerTestIn):
         tools_catalog="TOOLS DISPONIBLES: get_help, identify_customer, get_report, create_ticket",
         request_id="planner-test",
     )
-    return {"ok": True, "plan": plan}
\ No newline at end of file
+    return {"ok": True, "plan": plan}
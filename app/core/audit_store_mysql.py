@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import json
 from typing import Any, Dict, Optional
 
+import orjson
+
 from sqlalchemy import text
 
 from app.infra.db import get_db_session
@@ -40,7 +41,7 @@ class MySQLAuditStore:
                     "intent": intent,
                     "tool_name": tool_name,
                     "confirmed": 1 if confirmed else 0 if confirmed is not None else None,
-                    "payload_json": json.dumps(payload, ensure_ascii=False) if payload is not None else None,
+                    "payload_json": orjson.dumps(payload).decode("utf-8") if payload is not None else None,
                 },
             )
             db.commit()
@@ -1,41 +1,48 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+import orjson
 
 from sqlalchemy import text
 
 from app.infra.db import get_db_session
 
+_INSERT_SQL = text(
+    """
+    INSERT INTO audit_events
+      (request_id, session_id, type, channel, intent, tool_name, confirmed, payload_json)
+    VALUES
+      (:request_id, :session_id, :type, :channel, :intent, :tool_name, :confirmed, :payload_json)
+    """
+)
+
+
+def _row(evt: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "request_id": str(evt.get("request_id", "")),
+        "session_id": str(evt.get("session_id", "")),
+        "type": str(evt.get("type", "UNKNOWN")),
+        "channel": evt.get("channel"),
+        "intent": evt.get("intent"),
+        "tool_name": evt.get("tool_name"),
+        "confirmed": evt.get("confirmed"),
+        "payload_json": orjson.dumps(evt).decode("utf-8"),
+    }
+
 
 class MySQLAuditWriter:
     def append(self, evt: Dict[str, Any]) -> None:
-        request_id = str(evt.get("request_id", ""))
-        session_id = str(evt.get("session_id", ""))
-        evt_type = str(evt.get("type", "UNKNOWN"))
+        self.append_batch([evt])
 
+    def append_batch(self, events: List[Dict[str, Any]]) -> None:
+        # Un solo INSERT multi-fila (executemany) + un solo commit por lote:
+        # amortiza el fsync que antes pagaba cada evento por separado.
+        if not events:
+            return
         db = get_db_session()
         try:
-            db.execute(
-                text(
-                    """
-                    INSERT INTO audit_events
-                      (request_id, session_id, type, channel, intent, tool_name, confirmed, payload_json)
-                    VALUES
-                      (:request_id, :session_id, :type, :channel, :intent, :tool_name, :confirmed, :payload_json)
-                    """
-                ),
-                {
-                    "request_id": request_id,
-                    "session_id": session_id,
-                    "type": evt_type,
-                    "channel": evt.get("channel"),
-                    "intent": evt.get("intent"),
-                    "tool_name": evt.get("tool_name"),
-                    "confirmed": evt.get("confirmed"),
-                    "payload_json": json.dumps(evt, ensure_ascii=False),
-                },
-            )
+            db.execute(_INSERT_SQL, [_row(evt) for evt in events])
             db.commit()
         finally:
             db.close()
\ No newline at end of file
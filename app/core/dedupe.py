@@ -1,9 +1,41 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
+import math
 import time
 from typing import Protocol
 
 
+class BloomFilter:
+    """
+    Bloom filter simple (solo stdlib): sin falsos negativos, falsos positivos
+    acotados por error_rate. Sirve de front local del dedupe: "seguro nuevo"
+    se responde en nanosegundos sin esperar el round-trip al store.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self._num_bits = num_bits
+        self._num_hashes = max(1, round((num_bits / capacity) * math.log(2)))
+        # bytearray ya viene zero-fill: las páginas quedan tocadas de entrada
+        self._bits = bytearray((num_bits + 7) // 8)
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little")
+        b = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._num_hashes):
+            yield (a + i * b) % self._num_bits
+
+    def add(self, key: str) -> None:
+        for idx in self._indexes(key):
+            self._bits[idx >> 3] |= 1 << (idx & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[idx >> 3] & (1 << (idx & 7)) for idx in self._indexes(key))
+
+
 class DedupeStore(Protocol):
     async def seen(self, provider: str, message_id: str) -> bool: ...
     async def mark(self, provider: str, message_id: str, ttl_sec: int | None = None, payload_hash: str | None = None) -> bool: ...
@@ -13,8 +45,11 @@ class DedupeStore(Protocol):
 class MemoryDedupeStore:
     def __init__(self, ttl_sec: int = 3600):
         self.ttl_sec = ttl_sec
-        # key = f"{provider}:{message_id}" -> first_seen_epoch
+        # key = f"{provider}:{message_id}" -> expires_at_epoch
         self._store: dict[str, int] = {}
+        # Heap (expires_at, key): cada sweep paga O(k log n) por k vencidos,
+        # no O(n) por recorrer todo el dict en cada seen/mark.
+        self._heap: list[tuple[int, str]] = []
 
     async def seen(self, provider: str, message_id: str) -> bool:
         self._cleanup()
@@ -33,7 +68,9 @@ class MemoryDedupeStore:
         key = f"{provider}:{message_id}"
         if key in self._store:
             return False
-        self._store[key] = int(time.time())
+        expires_at = int(time.time()) + int(ttl_sec or self.ttl_sec)
+        self._store[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, key))
         return True
 
     async def cleanup(self) -> int:
@@ -41,8 +78,11 @@ class MemoryDedupeStore:
 
     def _cleanup(self) -> int:
         now = int(time.time())
-        ttl = self.ttl_sec
-        expired = [k for k, ts in self._store.items() if now - ts > ttl]
-        for k in expired:
-            self._store.pop(k, None)
-        return len(expired)
\ No newline at end of file
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            exp, key = heapq.heappop(self._heap)
+            # Entradas stale (key re-marcada tras vencer) se filtran comparando
+            if self._store.get(key) == exp:
+                self._store.pop(key, None)
+                removed += 1
+        return removed
\ No newline at end of file
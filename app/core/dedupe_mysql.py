@@ -1,16 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
-from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import text
-from sqlalchemy.exc import IntegrityError
 
-from app.infra.db import get_db_session
+from app.infra.db import get_async_db_session
 
 
 def sha256_payload(raw: bytes) -> str:
-    return hashlib.sha256(raw).hexdigest()
+    # Huella para dedupe, no criptografía: usedforsecurity=False evita los
+    # checks FIPS y deja que el backend OpenSSL use su ruta acelerada (SHA-NI)
+    return hashlib.sha256(raw, usedforsecurity=False).hexdigest()
 
 
 class MySQLDedupeStore:
@@ -18,22 +19,24 @@ class MySQLDedupeStore:
         self.ttl_sec_default = ttl_sec_default
 
     async def seen(self, provider: str, message_id: str) -> bool:
-        db = get_db_session()
+        db = get_async_db_session()
         try:
-            row = db.execute(
-                text(
-                    """
-                    SELECT 1
-                    FROM dedupe_messages
-                    WHERE provider = :provider AND message_id = :message_id
-                    LIMIT 1
-                    """
-                ),
-                {"provider": provider, "message_id": message_id},
+            row = (
+                await db.execute(
+                    text(
+                        """
+                        SELECT 1
+                        FROM dedupe_messages
+                        WHERE provider = :provider AND message_id = :message_id
+                        LIMIT 1
+                        """
+                    ),
+                    {"provider": provider, "message_id": message_id},
+                )
             ).fetchone()
             return row is not None
         finally:
-            db.close()
+            await db.close()
 
     async def mark(
         self,
@@ -42,47 +45,163 @@ class MySQLDedupeStore:
         ttl_sec: int | None = None,
         payload_hash: str | None = None,
     ) -> bool:
+        # El tiempo lo pone el servidor (UTC_TIMESTAMP): cero datetimes en
+        # Python y sin skew de reloj entre app y DB
         ttl = ttl_sec or self.ttl_sec_default
-        now = datetime.now(timezone.utc).replace(tzinfo=None)
-        expires_at = (datetime.now(timezone.utc) + timedelta(seconds=ttl)).replace(tzinfo=None)
 
-        db = get_db_session()
+        db = get_async_db_session()
         try:
+            # INSERT IGNORE: el duplicado es un no-op con rowcount 0, sin el
+            # unwind de IntegrityError ni el rollback en el camino de retry
+            res = await db.execute(
+                text(
+                    """
+                    INSERT IGNORE INTO dedupe_messages
+                      (provider, message_id, first_seen_at, expires_at, payload_hash)
+                    VALUES
+                      (:provider, :message_id, UTC_TIMESTAMP(),
+                       DATE_ADD(UTC_TIMESTAMP(), INTERVAL :ttl SECOND), :payload_hash)
+                    """
+                ),
+                {
+                    "provider": provider,
+                    "message_id": message_id,
+                    "ttl": ttl,
+                    "payload_hash": payload_hash,
+                },
+            )
+            await db.commit()
+            return bool(res.rowcount)
+        finally:
+            await db.close()
+
+    async def cleanup(self, batch_size: int = 10_000) -> int:
+        # DELETE en lotes: un borrado gigante toma row-locks largos y castiga
+        # la replicación; entre lotes cedemos el event loop.
+        db = get_async_db_session()
+        total = 0
+        try:
+            while True:
+                res = await db.execute(
+                    text("DELETE FROM dedupe_messages WHERE expires_at < UTC_TIMESTAMP() LIMIT :batch"),
+                    {"batch": batch_size},
+                )
+                await db.commit()
+                affected = int(res.rowcount or 0)
+                total += affected
+                if affected < batch_size:
+                    break
+                await asyncio.sleep(0)
+            return total
+        finally:
+            await db.close()
+
+
+class BatchedDedupeStore:
+    """
+    Micro-batching sobre MySQLDedupeStore: junta los mark() concurrentes de
+    un burst (hasta max_batch items o max_wait_ms) y los resuelve con UN
+    SELECT ... IN y UN INSERT IGNORE multi-fila, en vez de 2 round-trips por
+    request. Cada caller espera su Future con el resultado individual.
+    """
+
+    def __init__(self, inner: MySQLDedupeStore, max_batch: int = 128, max_wait_ms: int = 5):
+        self.inner = inner
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker_task: asyncio.Task | None = None
+
+    async def seen(self, provider: str, message_id: str) -> bool:
+        return await self.inner.seen(provider, message_id)
+
+    async def cleanup(self, batch_size: int = 10_000) -> int:
+        return await self.inner.cleanup(batch_size=batch_size)
+
+    async def mark(
+        self,
+        provider: str,
+        message_id: str,
+        ttl_sec: int | None = None,
+        payload_hash: str | None = None,
+    ) -> bool:
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.get_running_loop().create_task(self._worker())
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        ttl = ttl_sec or self.inner.ttl_sec_default
+        self._queue.put_nowait((provider, message_id, ttl, payload_hash, fut))
+        return await fut
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Ventana corta para coalescer el resto del burst
+            await asyncio.sleep(self.max_wait_ms / 1000)
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
             try:
-                db.execute(
+                await self._flush(batch)
+            except Exception as e:
+                for _, _, _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    async def _flush(self, batch) -> None:
+        db = get_async_db_session()
+        try:
+            pairs = [(p, m) for p, m, _, _, _ in batch]
+            placeholders = ", ".join(f"(:p{i}, :m{i})" for i in range(len(pairs)))
+            params = {}
+            for i, (p, m) in enumerate(pairs):
+                params[f"p{i}"] = p
+                params[f"m{i}"] = m
+
+            rows = (
+                await db.execute(
+                    text(
+                        "SELECT provider, message_id FROM dedupe_messages "
+                        f"WHERE (provider, message_id) IN ({placeholders})"
+                    ),
+                    params,
+                )
+            ).fetchall()
+            existing = {(r[0], r[1]) for r in rows}
+
+            # Primera aparición en el lote gana; el resto son duplicados
+            to_insert = []
+            first_seen_in_batch = set()
+            results = []
+            for provider, message_id, ttl, payload_hash, fut in batch:
+                key = (provider, message_id)
+                is_first = key not in existing and key not in first_seen_in_batch
+                if is_first:
+                    first_seen_in_batch.add(key)
+                    to_insert.append(
+                        {"provider": provider, "message_id": message_id, "ttl": ttl, "payload_hash": payload_hash}
+                    )
+                results.append((fut, is_first))
+
+            if to_insert:
+                await db.execute(
                     text(
                         """
-                        INSERT INTO dedupe_messages
+                        INSERT IGNORE INTO dedupe_messages
                           (provider, message_id, first_seen_at, expires_at, payload_hash)
                         VALUES
-                          (:provider, :message_id, :first_seen_at, :expires_at, :payload_hash)
+                          (:provider, :message_id, UTC_TIMESTAMP(),
+                           DATE_ADD(UTC_TIMESTAMP(), INTERVAL :ttl SECOND), :payload_hash)
                         """
                     ),
-                    {
-                        "provider": provider,
-                        "message_id": message_id,
-                        "first_seen_at": now,
-                        "expires_at": expires_at,
-                        "payload_hash": payload_hash,
-                    },
+                    to_insert,
                 )
-                db.commit()
-                return True
-            except IntegrityError:
-                db.rollback()
-                return False
-        finally:
-            db.close()
+                await db.commit()
 
-    async def cleanup(self) -> int:
-        now = datetime.now(timezone.utc).replace(tzinfo=None)
-        db = get_db_session()
-        try:
-            res = db.execute(
-                text("DELETE FROM dedupe_messages WHERE expires_at < :now"),
-                {"now": now},
-            )
-            db.commit()
-            return int(res.rowcount or 0)
+            for fut, is_first in results:
+                if not fut.done():
+                    fut.set_result(is_first)
         finally:
-            db.close()
\ No newline at end of file
+            await db.close()
@@ -1,24 +1,37 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
 
 class EventWriter:
     """Interfaz mínima para persistir eventos (DB/archivo/queue)."""
     def append(self, evt: Dict[str, Any]) -> None: ...
+    def append_batch(self, events: List[Dict[str, Any]]) -> None: ...
 
 
 class EventBus:
     """
-    Auditoría append-only (in-memory) + opcional persistencia via writer.
+    Auditoría append-only (in-memory acotada) + opcional persistencia via writer.
+
+    El buffer in-memory es un deque con maxlen: útil en dev, sin leak en
+    procesos largos. Con keep_in_memory=False (prod con writer) no se guarda
+    nada en memoria y la fuente de verdad es el writer.
     """
-    def __init__(self, writer: Optional[EventWriter] = None):
-        self._events: List[Dict[str, Any]] = []
+    def __init__(
+        self,
+        writer: Optional[EventWriter] = None,
+        mem_cap: int = 1024,
+        keep_in_memory: bool = True,
+    ):
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=mem_cap)
         self._writer = writer
+        # Sin writer siempre retenemos en memoria, si no los eventos se pierden
+        self._keep_in_memory = keep_in_memory or writer is None
 
     def append(self, evt: Dict[str, Any]) -> None:
-        # siempre guardamos in-memory (útil en dev)
-        self._events.append(evt)
+        if self._keep_in_memory:
+            self._events.append(evt)
 
         # si hay writer, persistimos, pero sin romper el request si falla
         if self._writer is not None:
@@ -27,5 +40,22 @@ class EventBus:
             except Exception:
                 pass
 
+    def append_batch(self, events: List[Dict[str, Any]]) -> None:
+        """Persistir varios eventos juntos (amortiza el costo del writer)."""
+        if self._keep_in_memory:
+            self._events.extend(events)
+
+        if self._writer is None:
+            return
+        try:
+            batch_append = getattr(self._writer, "append_batch", None)
+            if batch_append is not None:
+                batch_append(events)
+            else:
+                for evt in events:
+                    self._writer.append(evt)
+        except Exception:
+            pass
+
     def list(self) -> List[Dict[str, Any]]:
-        return list(self._events)
\ No newline at end of file
+        return list(self._events)
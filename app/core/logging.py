@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
 import logging
 import sys
 from datetime import datetime
 from typing import Any
 
+import orjson
+
 
 logger = logging.getLogger("app")
 
@@ -28,7 +29,11 @@ class _JsonFormatter(logging.Formatter):
         # extras
         if hasattr(record, "extra") and isinstance(record.extra, dict):
             base.update(record.extra)
-        return json.dumps(base, ensure_ascii=False)
+        try:
+            return orjson.dumps(base).decode("utf-8")
+        except TypeError:
+            # extras no serializables: degradar a repr por campo
+            return orjson.dumps({k: repr(v) for k, v in base.items()}).decode("utf-8")
 
 
 def log_event(event: str, **fields: Any) -> None:
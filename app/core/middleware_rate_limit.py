@@ -15,6 +15,7 @@ class RateLimitIPMiddleware(BaseHTTPMiddleware):
             max_requests=settings.RATE_LIMIT_IP_MAX,
             window_sec=settings.RATE_LIMIT_IP_WINDOW_SEC,
         )
+        self.limiter.warmup()
 
     async def dispatch(self, request: Request, call_next):
         if not settings.RATE_LIMIT_ENABLED:
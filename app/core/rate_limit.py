@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import math
+import threading
 import time
-from collections import deque
 from dataclasses import dataclass
-from typing import Deque, Dict
+from typing import Dict, List, Tuple
 
 
 @dataclass
@@ -15,27 +16,90 @@ class RateLimitResult:
 class MemoryFixedWindowLimiter:
     """
     Fixed window rate limiter (simple).
-    Guarda timestamps por key y mantiene solo los de la ventana.
+    Estado por key: (epoch_de_ventana, contador) — O(1) por check y O(1) de
+    memoria por key, en vez del deque de timestamps que había que drenar.
+    Sharded en N buckets con lock propio: los check() de keys distintas no se
+    serializan entre sí.
     """
+
+    _NUM_SHARDS = 16
+
     def __init__(self, max_requests: int, window_sec: int):
         self.max_requests = max_requests
         self.window_sec = window_sec
-        self._buckets: Dict[str, Deque[float]] = {}
+        self._shards: List[Dict[str, Tuple[int, int]]] = [{} for _ in range(self._NUM_SHARDS)]
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(self._NUM_SHARDS)]
 
     def check(self, key: str) -> RateLimitResult:
+        idx = hash(key) & (self._NUM_SHARDS - 1)
         now = time.time()
-        q = self._buckets.get(key)
-        if q is None:
-            q = deque()
-            self._buckets[key] = q
+        win = int(now // self.window_sec)
+
+        with self._locks[idx]:
+            buckets = self._shards[idx]
+            slot = buckets.get(key)
 
-        cutoff = now - self.window_sec
-        while q and q[0] < cutoff:
-            q.popleft()
+            if slot is None or slot[0] != win:
+                buckets[key] = (win, 1)
+                return RateLimitResult(allowed=True)
 
-        if len(q) >= self.max_requests:
-            retry_after = int(max(1, (q[0] + self.window_sec) - now))
+            if slot[1] < self.max_requests:
+                buckets[key] = (win, slot[1] + 1)
+                return RateLimitResult(allowed=True)
+
+            retry_after = int(max(1, (win + 1) * self.window_sec - now))
             return RateLimitResult(allowed=False, retry_after_sec=retry_after)
 
-        q.append(now)
-        return RateLimitResult(allowed=True)
\ No newline at end of file
+    def warmup(self, n: int = 1024) -> None:
+        """Pre-dimensiona shards/deques para evitar el spike del primer tráfico."""
+        for i in range(n):
+            self.check(f"__warmup__:{i}")
+        for shard in self._shards:
+            shard.clear()
+
+
+class MemoryTokenBucketLimiter:
+    """
+    Token bucket: refill continuo + burst acotado.
+    Evita el problema de la ventana fija (2x max en el borde de ventana) y no
+    necesita cleanup periódico: el estado por key son dos floats.
+    """
+
+    _NUM_SHARDS = 16
+
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate_per_sec = float(rate_per_sec)
+        self.burst = float(burst)
+        # [tokens, last_refill] por key, sharded para achicar contención de lock
+        self._shards: List[Dict[str, List[float]]] = [{} for _ in range(self._NUM_SHARDS)]
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(self._NUM_SHARDS)]
+
+    def check(self, key: str) -> RateLimitResult:
+        idx = hash(key) & (self._NUM_SHARDS - 1)
+        now = time.monotonic()
+
+        with self._locks[idx]:
+            bucket = self._shards[idx].get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._shards[idx][key] = bucket
+
+            tokens, last = bucket
+            tokens = min(self.burst, tokens + (now - last) * self.rate_per_sec)
+
+            if tokens >= 1.0:
+                bucket[0] = tokens - 1.0
+                bucket[1] = now
+                return RateLimitResult(allowed=True)
+
+            bucket[0] = tokens
+            bucket[1] = now
+            retry_after = math.ceil((1.0 - tokens) / self.rate_per_sec) if self.rate_per_sec > 0 else 1
+            return RateLimitResult(allowed=False, retry_after_sec=max(1, int(retry_after)))
+
+    def warmup(self, n: int = 1024) -> None:
+        """Pre-dimensiona shards/deques para evitar el spike del primer tráfico."""
+        for i in range(n):
+            self.check(f"__warmup__:{i}")
+        for shard in self._shards:
+            shard.clear()
@@ -1,8 +1,17 @@
 import hmac
 import hashlib
+import threading
 import time
+from collections import OrderedDict
 from typing import Optional
 
+# Cache LRU del resultado de verificación: los proveedores reintentan el mismo
+# (body, timestamp, signature) varias veces y el HMAC es el paso caro.
+# Sin falsos compartidos entre secrets: el fingerprint del secret es parte de la key.
+_VERIFY_CACHE: "OrderedDict[tuple, bool]" = OrderedDict()
+_VERIFY_CACHE_MAX = 4096
+_VERIFY_CACHE_LOCK = threading.Lock()
+
 
 def verify_webhook_signature(
     body: bytes,
@@ -11,6 +20,7 @@ def verify_webhook_signature(
     secret: str,
     replay_window_sec: int = 300,
     max_future_skew_sec: int = 30,  # tolerancia reloj proveedor
+    parsed_ts: Optional[int] = None,
 ) -> bool:
     # 1) Validaciones básicas
     if not secret:
@@ -20,12 +30,25 @@ def verify_webhook_signature(
     if not timestamp:
         return False
 
-    # 2) Timestamp debe ser número (epoch seconds)
+    # 1b) Una firma HMAC-SHA256 hex tiene exactamente 64 chars: cualquier otra
+    # forma no puede ser válida, así que se rechaza antes de tocar el body
+    if len(signature) != 64:
+        return False
     try:
-        ts = int(timestamp)
-    except Exception:
+        int(signature, 16)
+    except ValueError:
         return False
 
+    # 2) Timestamp debe ser número (epoch seconds); el caller puede pasarlo ya
+    # parseado (parsed_ts) para no re-parsear el mismo header
+    if parsed_ts is not None:
+        ts = parsed_ts
+    else:
+        try:
+            ts = int(timestamp)
+        except Exception:
+            return False
+
     now = int(time.time())
 
     # 3) Anti-replay window: demasiado viejo o demasiado futuro => rechazo
@@ -34,7 +57,18 @@ def verify_webhook_signature(
     if ts > (now + max_future_skew_sec):
         return False
 
-    # 4) Construcción de mensaje a firmar (IMPORTANTE: esto debe coincidir con tu proveedor)
+    # 4) Cache hit: retries del proveedor no recomputan el HMAC
+    body_hash = hashlib.sha256(body).hexdigest()
+    secret_fp = hashlib.sha256(secret.encode("utf-8")).hexdigest()[:16]
+    cache_key = (body_hash, timestamp, signature, secret_fp)
+
+    with _VERIFY_CACHE_LOCK:
+        cached = _VERIFY_CACHE.get(cache_key)
+        if cached is not None:
+            _VERIFY_CACHE.move_to_end(cache_key)
+            return cached
+
+    # 5) Construcción de mensaje a firmar (IMPORTANTE: esto debe coincidir con tu proveedor)
     # Patrón común: f"{timestamp}.{body}"
     msg = timestamp.encode("utf-8") + b"." + body
 
@@ -44,5 +78,13 @@ def verify_webhook_signature(
         digestmod=hashlib.sha256,
     ).hexdigest()
 
-    # 5) Comparación segura (evita timing attacks)
-    return hmac.compare_digest(expected, signature)
\ No newline at end of file
+    # 6) Comparación segura (evita timing attacks)
+    ok = hmac.compare_digest(expected, signature)
+
+    with _VERIFY_CACHE_LOCK:
+        _VERIFY_CACHE[cache_key] = ok
+        _VERIFY_CACHE.move_to_end(cache_key)
+        while len(_VERIFY_CACHE) > _VERIFY_CACHE_MAX:
+            _VERIFY_CACHE.popitem(last=False)
+
+    return ok
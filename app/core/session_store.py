@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import Any, Dict, Optional, Protocol
 
@@ -15,28 +16,48 @@ class MemorySessionStore:
         self._store: dict[str, dict[str, Any]] = {}
 
     async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
-        self._cleanup()
         item = self._store.get(session_id)
         if not item:
             return None
+        if int(time.time()) - int(item["ts"]) > self.ttl_sec:
+            self._store.pop(session_id, None)
+            return None
         return item["value"]
 
     async def set(self, session_id: str, value: Dict[str, Any]) -> None:
-        self._cleanup()
         self._store[session_id] = {"value": value, "ts": int(time.time())}
 
-    # sync helpers (para simplificar orchestrator)
+    async def cleanup(self) -> int:
+        return self._cleanup()
+
+    # sync helpers (para simplificar scripts)
     def get_sync(self, session_id: str) -> Optional[Dict[str, Any]]:
-        self._cleanup()
         item = self._store.get(session_id)
-        return item["value"] if item else None
+        if not item:
+            return None
+        if int(time.time()) - int(item["ts"]) > self.ttl_sec:
+            self._store.pop(session_id, None)
+            return None
+        return item["value"]
 
     def set_sync(self, session_id: str, value: Dict[str, Any]) -> None:
-        self._cleanup()
         self._store[session_id] = {"value": value, "ts": int(time.time())}
 
-    def _cleanup(self) -> None:
+    def _cleanup(self) -> int:
+        # Barrido completo: correr desde gc_loop / cleanup(), no por operación
         now = int(time.time())
         expired = [k for k, v in self._store.items() if now - int(v["ts"]) > self.ttl_sec]
         for k in expired:
-            self._store.pop(k, None)
\ No newline at end of file
+            self._store.pop(k, None)
+        return len(expired)
+
+
+async def gc_loop(store: MemorySessionStore, interval_sec: int = 60) -> None:
+    """
+    Barrido periódico para MemorySessionStore (lanzar con asyncio.create_task
+    en el lifespan si se usa el store en memoria). Saca el scan O(n) del
+    camino de cada get/set; la expiración por lectura cubre el intervalo.
+    """
+    while True:
+        await asyncio.sleep(interval_sec)
+        store._cleanup()
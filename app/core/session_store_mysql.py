@@ -1,106 +1,119 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime, timedelta, timezone
+import asyncio
 from typing import Any, Dict, Optional
 
-from sqlalchemy import text
-
-from app.infra.db import get_db_session
+import orjson
+from sqlalchemy import Column, MetaData, String, TIMESTAMP, Table, Text, bindparam, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+from app.infra.db import get_async_db_session
+
+# Tabla mínima solo para compilar el UPSERT como construcción Core: así el
+# statement entra en el compiled-query cache de SQLAlchemy en vez de
+# re-parsear el text() en cada set(). El DDL real vive en infra/bootstrap.py.
+_metadata = MetaData()
+_sessions = Table(
+    "sessions",
+    _metadata,
+    Column("session_id", String(128), primary_key=True),
+    # Text y no JSON: los valores llegan ya serializados como str; el tipo JSON
+    # de SQLAlchemy los volvería a encodear (doble serialización)
+    Column("history_json", Text),
+    Column("facts_json", Text),
+    Column("expires_at", TIMESTAMP),
+)
+
+# expires_at lo calcula MySQL (DATE_ADD sobre UTC_TIMESTAMP): cero datetimes
+# en Python y sin skew de reloj entre app y DB, igual que el dedupe store.
+# updated_at no se setea explícito: la columna tiene ON UPDATE CURRENT_TIMESTAMP
+_upsert = mysql_insert(_sessions).values(
+    session_id=bindparam("session_id"),
+    history_json=bindparam("history_json"),
+    facts_json=bindparam("facts_json"),
+    expires_at=text("DATE_ADD(UTC_TIMESTAMP(), INTERVAL :ttl SECOND)"),
+)
+_SESSION_UPSERT = _upsert.on_duplicate_key_update(
+    history_json=_upsert.inserted.history_json,
+    facts_json=_upsert.inserted.facts_json,
+    expires_at=_upsert.inserted.expires_at,
+)
 
 
 class MySQLSessionStore:
     def __init__(self, ttl_sec: int = 3600):
         self.ttl_sec = ttl_sec
 
-    # -----------------------
-    # ASYNC API (compat)
-    # -----------------------
     async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
-        return self.get_sync(session_id)
-
-    async def set(self, session_id: str, session_data: Dict[str, Any]) -> None:
-        self.set_sync(session_id, session_data)
-
-    async def cleanup(self) -> int:
-        return self.cleanup_sync()
-
-    # -----------------------
-    # SYNC API (lo que usa tu orchestrator hoy)
-    # -----------------------
-    def get_sync(self, session_id: str) -> Optional[Dict[str, Any]]:
-        db = get_db_session()
+        db = get_async_db_session()
         try:
-            row = db.execute(
-                text(
-                    """
-                    SELECT history_json, facts_json, expires_at
-                    FROM sessions
-                    WHERE session_id = :session_id
-                    LIMIT 1
-                    """
-                ),
-                {"session_id": session_id},
+            # El filtro de expiración también es server-side: una sesión
+            # vencida directamente no vuelve
+            row = (
+                await db.execute(
+                    text(
+                        """
+                        SELECT history_json, facts_json
+                        FROM sessions
+                        WHERE session_id = :session_id
+                          AND (expires_at IS NULL OR expires_at >= UTC_TIMESTAMP())
+                        LIMIT 1
+                        """
+                    ),
+                    {"session_id": session_id},
+                )
             ).fetchone()
 
             if not row:
                 return None
 
-            history_json, facts_json, expires_at = row
-
-            if expires_at is not None:
-                now = datetime.now(timezone.utc).replace(tzinfo=None)
-                if expires_at < now:
-                    return None
+            history_json, facts_json = row
 
             return {
-                "history": json.loads(history_json) if history_json else [],
-                "facts": json.loads(facts_json) if facts_json else {},
+                "history": orjson.loads(history_json) if history_json else [],
+                "facts": orjson.loads(facts_json) if facts_json else {},
             }
         finally:
-            db.close()
+            await db.close()
 
-    def set_sync(self, session_id: str, session_data: Dict[str, Any]) -> None:
+    async def set(self, session_id: str, session_data: Dict[str, Any]) -> None:
         history = session_data.get("history", [])
         facts = session_data.get("facts", {})
 
-        now_utc = datetime.now(timezone.utc)
-        expires_at = (now_utc + timedelta(seconds=self.ttl_sec)).replace(tzinfo=None)
-
-        db = get_db_session()
+        db = get_async_db_session()
         try:
-            db.execute(
-                text(
-                    """
-                    INSERT INTO sessions (session_id, history_json, facts_json, expires_at)
-                    VALUES (:session_id, :history_json, :facts_json, :expires_at)
-                    ON DUPLICATE KEY UPDATE
-                      history_json = VALUES(history_json),
-                      facts_json = VALUES(facts_json),
-                      expires_at = VALUES(expires_at),
-                      updated_at = CURRENT_TIMESTAMP
-                    """
-                ),
+            await db.execute(
+                _SESSION_UPSERT,
                 {
                     "session_id": session_id,
-                    "history_json": json.dumps(history, ensure_ascii=False),
-                    "facts_json": json.dumps(facts, ensure_ascii=False),
-                    "expires_at": expires_at,
+                    "history_json": orjson.dumps(history).decode("utf-8"),
+                    "facts_json": orjson.dumps(facts).decode("utf-8"),
+                    "ttl": self.ttl_sec,
                 },
             )
-            db.commit()
+            await db.commit()
         finally:
-            db.close()
+            await db.close()
 
-    def cleanup_sync(self) -> int:
-        now = datetime.now(timezone.utc).replace(tzinfo=None)
-        db = get_db_session()
+    async def cleanup(self, batch_size: int = 10_000) -> int:
+        # Mismo patrón de lotes que el dedupe: acota el lock por statement
+        db = get_async_db_session()
+        total = 0
         try:
-            res = db.execute(
-                text("DELETE FROM sessions WHERE expires_at IS NOT NULL AND expires_at < :now"),
-                {"now": now},
-            )
-            db.commit()
-            return int(res.rowcount or 0)
+            while True:
+                res = await db.execute(
+                    text(
+                        "DELETE FROM sessions "
+                        "WHERE expires_at IS NOT NULL AND expires_at < UTC_TIMESTAMP() LIMIT :batch"
+                    ),
+                    {"batch": batch_size},
+                )
+                await db.commit()
+                affected = int(res.rowcount or 0)
+                total += affected
+                if affected < batch_size:
+                    break
+                await asyncio.sleep(0)
+            return total
         finally:
-            db.close()
\ No newline at end of file
+            await db.close()
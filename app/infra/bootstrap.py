@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from sqlalchemy import text
+import pymysql
+from pymysql.constants import CLIENT
 from sqlalchemy.engine import Engine
 
 # NOTE:
@@ -12,6 +13,7 @@ from sqlalchemy.engine import Engine
 # - app/core/audit_writer_mysql.py
 # - app/agent/confirmations_db.py
 # - app/plugins/customer_registration_tools.py (optional but shipped)
+# - app/plugins/appointments_tools.py (optional but shipped)
 
 DDL = [
     # ------------------------------------------------------------
@@ -60,6 +62,10 @@ DDL = [
       payload_hash CHAR(64) NULL,
       first_seen_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
       expires_at TIMESTAMP NULL,
+      -- La PK (provider, message_id) hace atómico el mark() por IntegrityError
+      -- y deja seen() como point lookup; idx_dedupe_expires acota el cleanup a
+      -- O(vencidos). El costo de mantener ambos índices es marginal frente al
+      -- full scan que evitan en tablas calientes.
       PRIMARY KEY (provider, message_id),
       INDEX idx_dedupe_expires (expires_at)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -71,15 +77,21 @@ DDL = [
     """
     CREATE TABLE IF NOT EXISTS pending_confirmations (
       token VARCHAR(128) PRIMARY KEY,
+      short_code VARCHAR(16) NULL,
       session_id VARCHAR(128) NOT NULL,
       tool_name VARCHAR(80) NOT NULL,
+      -- tool_args_json es JSON nativo a propósito: MySQL lo almacena en binario
+      -- y el dispatcher rutea por tool_name (columna real indexable), así que
+      -- consume() solo deserializa los args cuando de verdad los necesita.
       tool_args_json JSON NOT NULL,
       status ENUM('pending','consumed','expired') NOT NULL DEFAULT 'pending',
       created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
       expires_at TIMESTAMP NULL,
       consumed_at TIMESTAMP NULL,
       INDEX idx_conf_session_status (session_id, status),
-      INDEX idx_conf_expires (expires_at)
+      INDEX idx_conf_expires (expires_at),
+      INDEX idx_conf_status_expires (status, expires_at),
+      UNIQUE KEY uq_conf_short_code (short_code)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
     """,
 
@@ -107,6 +119,11 @@ DDL = [
       attempts INT NOT NULL DEFAULT 0,
       used_at TIMESTAMP NULL,
       created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      -- code_active vale 1 solo para el código vigente (NULL no colisiona en
+      -- el UNIQUE): garantiza a lo sumo un código activo por cliente y deja
+      -- que register/resend emitan con UN solo INSERT ... ON DUPLICATE KEY
+      code_active TINYINT AS (IF(used_at IS NULL, 1, NULL)) STORED,
+      UNIQUE KEY uq_ev_customer_active (customer_id, code_active),
       INDEX idx_ev_customer_used (customer_id, used_at),
       INDEX idx_ev_expires (expires_at),
       CONSTRAINT fk_ev_customer
@@ -114,11 +131,75 @@ DDL = [
         ON DELETE CASCADE
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
     """,
+    # ------------------------------------------------------------
+    # services + staff + appointments (used by appointments tools)
+    # ------------------------------------------------------------
+    """
+    CREATE TABLE IF NOT EXISTS services (
+      id INT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+      code VARCHAR(40) NOT NULL,
+      name VARCHAR(120) NULL,
+      duration_min INT NOT NULL,
+      active TINYINT(1) NOT NULL DEFAULT 1,
+      UNIQUE KEY uq_services_code (code)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS staff (
+      id INT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+      name VARCHAR(120) NOT NULL,
+      active TINYINT(1) NOT NULL DEFAULT 1,
+      INDEX idx_staff_name_active (name, active)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS appointments (
+      id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+      patient_session_id VARCHAR(128) NOT NULL,
+      patient_name VARCHAR(200) NULL,
+      service_code VARCHAR(40) NOT NULL,
+      staff_id INT UNSIGNED NULL,
+      start_at DATETIME NOT NULL,
+      end_at DATETIME NOT NULL,
+      status ENUM('booked','cancelled','completed') NOT NULL DEFAULT 'booked',
+      notes TEXT NULL,
+      created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      -- list/cancel filtran por sesión+status y ordenan por start_at: el índice
+      -- compuesto devuelve las filas ya ordenadas (sin filesort). El de staff
+      -- cubre _busy_starts y el chequeo de conflictos de reschedule.
+      INDEX idx_appt_session_status_start (patient_session_id, status, start_at),
+      INDEX idx_appt_staff_status_start (staff_id, status, start_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """,
 ]
 
 
 def ensure_tables(engine: Engine) -> None:
-    """Run idempotent DDL statements."""
-    with engine.begin() as conn:
-        for stmt in DDL:
-            conn.execute(text(stmt))
+    """
+    Run idempotent DDL statements.
+
+    Todo el script va en UN payload multi-statement (CLIENT.MULTI_STATEMENTS):
+    contra un MySQL remoto el cold-start paga una sola latencia de red en vez
+    de una por CREATE TABLE. La conexión es dedicada (no sale del pool) para
+    no habilitar multi-statements en las conexiones de la app.
+    """
+    url = engine.url
+    script = ";\n".join(stmt.strip().rstrip(";") for stmt in DDL) + ";"
+
+    conn = pymysql.connect(
+        host=url.host,
+        port=url.port or 3306,
+        user=url.username,
+        password=url.password or "",
+        database=url.database,
+        charset="utf8mb4",
+        client_flag=CLIENT.MULTI_STATEMENTS,
+        autocommit=True,
+    )
+    try:
+        with conn.cursor() as cur:
+            cur.execute(script)
+            while cur.nextset():
+                pass
+    finally:
+        conn.close()
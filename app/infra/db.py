@@ -3,6 +3,7 @@ from __future__ import annotations
 from urllib.parse import quote_plus
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 from app.settings import settings
 
@@ -11,27 +12,33 @@ class Base(DeclarativeBase):
     pass
 
 
-def database_url() -> str:
+def database_url(driver: str = "pymysql") -> str:
     user = settings.DB_USER
     pwd = quote_plus(settings.DB_PASS)  # evita romper URL si hay caracteres especiales
     host = settings.DB_HOST
     port = settings.DB_PORT
     name = settings.DB_NAME
 
-    return f"mysql+pymysql://{user}:{pwd}@{host}:{port}/{name}?charset=utf8mb4"
+    return f"mysql+{driver}://{user}:{pwd}@{host}:{port}/{name}?charset=utf8mb4"
 
 
 engine = create_engine(
     database_url(),
-    pool_pre_ping=True,
-    pool_recycle=1800,   # evita conexiones muertas (común en MySQL)
-    pool_size=10,
-    max_overflow=20,
+    pool_pre_ping=settings.DB_PRE_PING,
+    pool_recycle=settings.DB_RECYCLE_SEC,   # evita conexiones muertas (común en MySQL)
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     future=True,
 )
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 
+# Engine gemelo en AUTOCOMMIT (comparte el pool): para escrituras de un solo
+# statement (create de confirmaciones, sweeps en lote) el COMMIT explícito
+# solo agrega un roundtrip y frena el group-commit de MySQL.
+autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+AutocommitSessionLocal = sessionmaker(bind=autocommit_engine, autocommit=False, autoflush=False, future=True)
+
 
 def get_db():
     """Dependency para FastAPI."""
@@ -44,4 +51,29 @@ def get_db():
 
 def get_db_session():
     """Helper opcional para scripts/CLI."""
-    return SessionLocal()
\ No newline at end of file
+    return SessionLocal()
+
+
+def get_autocommit_session():
+    """Sesión AUTOCOMMIT para paths de un solo statement (sin COMMIT aparte)."""
+    return AutocommitSessionLocal()
+
+
+# ------------------------------------------------------------
+# Engine async (aiomysql): para los stores llamados desde handlers async.
+# Con el driver sync cada execute bloqueaba el event loop de uvicorn.
+# ------------------------------------------------------------
+async_engine = create_async_engine(
+    database_url(driver="aiomysql"),
+    pool_pre_ping=settings.DB_PRE_PING,
+    pool_recycle=settings.DB_RECYCLE_SEC,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False, autoflush=False)
+
+
+def get_async_db_session():
+    """Helper para stores async (una sesión por task; no compartir entre tasks)."""
+    return AsyncSessionLocal()
\ No newline at end of file
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import json
 import asyncio
-from typing import Any, Dict, Optional
+import hashlib
+from typing import Any, AsyncIterator, Dict, Optional
 
 import httpx
+import orjson
 
 from app.core.errors import LLMError
 
@@ -28,6 +29,8 @@ class OllamaCloudClient:
         model: str,
         timeout_sec: int = 30,
         retries: int = 2,
+        max_connections: int = 64,
+        max_concurrent: int = 16,
     ):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
@@ -35,6 +38,34 @@ class OllamaCloudClient:
         self.timeout_sec = timeout_sec
         self.retries = retries
 
+        # Cliente pooled compartido entre planner y answerer: keep-alive + HTTP/2
+        # evitan renegociar TCP/TLS en cada llamada (1 RTT menos por request).
+        self._client = httpx.AsyncClient(
+            timeout=timeout_sec,
+            http2=True,
+            # Headers estáticos una sola vez; por llamada solo viaja X-Request-Id
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max(1, max_connections // 2),
+            ),
+        )
+
+        # Coalescer de llamadas idénticas en vuelo: N prompts iguales
+        # concurrentes (thundering herd / retries) pagan UNA sola request
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Tope de llamadas simultáneas al upstream: acota el QPS hacia Ollama
+        # y suaviza la cola de tail-latency bajo ráfagas
+        self._concurrency = asyncio.Semaphore(max_concurrent)
+
+    async def aclose(self) -> None:
+        """Cerrar el pool (llamar en el shutdown de la app)."""
+        await self._client.aclose()
+
     async def chat_json(
         self,
         system: str,
@@ -60,6 +91,76 @@ class OllamaCloudClient:
         """
         return await self._chat(system=system, user=user, request_id=request_id)
 
+    async def chat_text_stream(self, system: str, user: str, request_id: str) -> AsyncIterator[str]:
+        """
+        Variante streaming de chat_text: va entregando chunks a medida que el
+        modelo genera (stream=true de /api/chat). Baja el time-to-first-token
+        a la latencia de un token en vez de la generación completa.
+
+        Mismas garantías de transporte que _chat: cuenta contra el semáforo de
+        concurrencia, reintenta errores de conexión mientras no se haya
+        emitido ningún chunk, y todo error sale envuelto en LLMError.
+        """
+        url = f"{self.base_url}/api/chat"
+
+        headers = {"X-Request-Id": request_id}
+
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            "stream": True,
+        }
+
+        async with self._concurrency:
+            last_err: Optional[Exception] = None
+
+            for attempt in range(self.retries + 1):
+                yielded = False
+                try:
+                    async with self._client.stream("POST", url, headers=headers, json=payload) as resp:
+                        if resp.status_code >= 400:
+                            body = await resp.aread()
+                            raise LLMError(f"Ollama error {resp.status_code}: {body[:800]!r}")
+
+                        # Ollama streaming: una línea JSON por chunk: {"message":{"content":"..."},"done":false}
+                        async for line in resp.aiter_lines():
+                            if not line.strip():
+                                continue
+                            try:
+                                data = orjson.loads(line)
+                            except Exception:
+                                continue
+                            if not isinstance(data, dict):
+                                continue
+
+                            message = data.get("message")
+                            if isinstance(message, dict):
+                                chunk = message.get("content")
+                                if isinstance(chunk, str) and chunk:
+                                    yielded = True
+                                    yield chunk
+
+                            if data.get("done"):
+                                break
+                    return
+
+                except (httpx.TimeoutException, httpx.NetworkError) as e:
+                    if yielded:
+                        # Ya entregamos texto al caller: no se puede reintentar
+                        # sin duplicar contenido
+                        raise LLMError(f"Ollama stream interrupted: {e}") from e
+                    last_err = e
+                    # backoff simple
+                    if attempt < self.retries:
+                        await asyncio.sleep(0.5 * (attempt + 1))
+                        continue
+                    break
+
+            raise LLMError(f"Failed calling Ollama after retries: {last_err}")
+
     async def _chat(
         self,
         system: str,
@@ -70,11 +171,7 @@ class OllamaCloudClient:
         # ✅ Ollama: /api/chat
         url = f"{self.base_url}/api/chat"
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "X-Request-Id": request_id,
-        }
+        headers = {"X-Request-Id": request_id}
 
         payload: Dict[str, Any] = {
             "model": self.model,
@@ -90,47 +187,75 @@ class OllamaCloudClient:
         if format_schema is not None:
             payload["format"] = format_schema
 
+        # Dedupe de llamadas idénticas en vuelo (mismo payload => misma respuesta)
+        key = hashlib.blake2b(
+            orjson.dumps(payload, option=orjson.OPT_SORT_KEYS),
+            digest_size=16,
+        ).hexdigest()
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await self._post_chat(url, headers, payload)
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            if fut.done() and fut.exception() is not None:
+                fut.exception()  # evita "exception was never retrieved"
+
+    async def _post_chat(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> str:
+        async with self._concurrency:
+            return await self._post_chat_unbounded(url, headers, payload)
+
+    async def _post_chat_unbounded(self, url: str, headers: Dict[str, str], payload: Dict[str, Any]) -> str:
         last_err: Optional[Exception] = None
 
-        async with httpx.AsyncClient(timeout=self.timeout_sec) as client:
-            for attempt in range(self.retries + 1):
-                try:
-                    resp = await client.post(url, headers=headers, json=payload)
+        for attempt in range(self.retries + 1):
+            try:
+                resp = await self._client.post(url, headers=headers, json=payload)
 
-                    # errores HTTP claros
-                    if resp.status_code >= 400:
-                        raise LLMError(f"Ollama error {resp.status_code}: {resp.text[:800]}")
+                # errores HTTP claros
+                if resp.status_code >= 400:
+                    raise LLMError(f"Ollama error {resp.status_code}: {resp.text[:800]}")
 
-                    data = resp.json()
+                # orjson sobre los bytes crudos: evita el parser stdlib de httpx
+                data = orjson.loads(resp.content)
 
-                    # Ollama normal: {"message":{"content":"..."}, "done":true}
-                    content = None
-                    if isinstance(data, dict):
-                        if isinstance(data.get("message"), dict):
-                            content = data["message"].get("content")
-                        # Compat OpenAI-like
-                        elif isinstance(data.get("choices"), list) and data["choices"]:
-                            content = data["choices"][0].get("message", {}).get("content")
-                        elif isinstance(data.get("content"), str):
-                            content = data.get("content")
+                # Ollama normal: {"message":{"content":"..."}, "done":true}
+                content = None
+                if isinstance(data, dict):
+                    if isinstance(data.get("message"), dict):
+                        content = data["message"].get("content")
+                    # Compat OpenAI-like
+                    elif isinstance(data.get("choices"), list) and data["choices"]:
+                        content = data["choices"][0].get("message", {}).get("content")
+                    elif isinstance(data.get("content"), str):
+                        content = data.get("content")
 
-                    if not isinstance(content, str) or not content.strip():
-                        raise LLMError(f"Unexpected LLM response shape: {json.dumps(data)[:800]}")
+                if not isinstance(content, str) or not content.strip():
+                    raise LLMError(f"Unexpected LLM response shape: {orjson.dumps(data).decode('utf-8')[:800]}")
 
-                    return content.strip()
+                return content.strip()
 
-                except (httpx.TimeoutException, httpx.NetworkError) as e:
-                    last_err = e
-                    # backoff simple
-                    if attempt < self.retries:
-                        await asyncio.sleep(0.5 * (attempt + 1))
-                        continue
-                    break
-                except Exception as e:
-                    last_err = e
-                    if attempt < self.retries:
-                        await asyncio.sleep(0.2 * (attempt + 1))
-                        continue
-                    break
+            except (httpx.TimeoutException, httpx.NetworkError) as e:
+                last_err = e
+                # backoff simple
+                if attempt < self.retries:
+                    await asyncio.sleep(0.5 * (attempt + 1))
+                    continue
+                break
+            except Exception as e:
+                last_err = e
+                if attempt < self.retries:
+                    await asyncio.sleep(0.2 * (attempt + 1))
+                    continue
+                break
 
         raise LLMError(f"Failed calling Ollama after retries: {last_err}")
\ No newline at end of file
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import smtplib
 from email.message import EmailMessage
 
+import aiosmtplib
+
 
 class SMTPMailer:
     def __init__(self, settings) -> None:
@@ -22,9 +23,14 @@ class SMTPMailer:
         msg["Subject"] = subject
         msg.set_content(body)
 
-        with smtplib.SMTP(self.host, self.port, timeout=20) as s:
-            s.ehlo()
-            s.starttls()
-            s.ehlo()
-            s.login(self.user, self.password)
-            s.send_message(msg)
\ No newline at end of file
+        # SMTP async nativo: el handshake TLS + login (cientos de ms) ya no
+        # congela el event loop como hacía smtplib
+        await aiosmtplib.send(
+            msg,
+            hostname=self.host,
+            port=self.port,
+            start_tls=True,
+            username=self.user,
+            password=self.password,
+            timeout=20,
+        )
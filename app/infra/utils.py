@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import base64
+import functools
 import importlib
-import uuid
+import itertools
+import os
+import threading
+import time
 from typing import Any, Callable
 
 
+@functools.lru_cache(maxsize=256)
 def import_from_path(path: str) -> Callable[..., Any]:
     """
     path: "module.submodule:function"
+
+    Memoizado: el import + getattr se paga una vez por path (el resultado es
+    estable por proceso; en dev con hot-reload el proceso se reinicia igual).
     """
     if ":" not in path:
         raise ValueError(f"Invalid import path: {path}")
@@ -19,5 +28,38 @@ def import_from_path(path: str) -> Callable[..., Any]:
     return func
 
 
+# Contador process-local (itertools.count es atómico en CPython)
+_request_id_counter = itertools.count()
+
+
 def new_request_id() -> str:
-    return uuid.uuid4().hex
\ No newline at end of file
+    # ULID-lite: timestamp ns + contador + pid. Ordenable por tiempo (ayuda a
+    # grep/tracing) y sin leer el CSPRNG del OS por request como uuid4.
+    # Los request ids necesitan unicidad dentro del servicio, no criptografía.
+    # Se queda en hex (24 chars vs 32 del uuid4.hex): base64 bajaría a ~16
+    # pero rompería el orden lexicográfico == orden temporal.
+    return f"{time.time_ns():016x}{next(_request_id_counter) & 0xFFFF:04x}{os.getpid() & 0xFFFF:04x}"
+
+
+# Pool de bytes aleatorios: un os.urandom() grande amortiza el syscall
+# sobre 64 tokens (el syscall domina el costo de tokens cortos).
+# Con lock: fast_token corre en threads del pool (asyncio.to_thread) y dos
+# threads leyendo/truncando el buffer sin sincronizar podrían emitir el
+# MISMO token (mismo patrón que _CODE_POOL en customer_registration_tools).
+_TOKEN_NBYTES = 16
+_rand_buf = bytearray()
+_rand_buf_lock = threading.Lock()
+
+
+def fast_token() -> str:
+    """
+    Equivalente a secrets.token_urlsafe(16) pero tomando los bytes de un
+    pool precargado. Mismo CSPRNG (os.urandom), misma forma de token.
+    """
+    global _rand_buf
+    with _rand_buf_lock:
+        if len(_rand_buf) < _TOKEN_NBYTES:
+            _rand_buf = bytearray(os.urandom(_TOKEN_NBYTES * 64))
+        chunk = bytes(_rand_buf[:_TOKEN_NBYTES])
+        del _rand_buf[:_TOKEN_NBYTES]
+    return base64.urlsafe_b64encode(chunk).rstrip(b"=").decode("ascii")
\ No newline at end of file
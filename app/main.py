@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-import uvicorn
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.settings import settings
 from app.api.health import router as health_router
@@ -21,19 +24,43 @@ from app.api.admin.cleanup import router as admin_cleanup_router
 from app.core.middleware_rate_limit import RateLimitIPMiddleware
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Construcción única detrás del lifespan: un solo orchestrator (y un solo
+    # pool de DB/HTTP) compartido por los tres canales, en vez de triplicar
+    # singletons a tiempo de import en cada router. Compartir también implica
+    # UN dedupe store persistente: un mismo message_id deduplica aunque entre
+    # por canales distintos o tras un reinicio.
+    from app.agent.orchestrator import AgentOrchestrator
+    from app.core.audit_writer_mysql import MySQLAuditWriter
+    from app.core.dedupe_mysql import BatchedDedupeStore, MySQLDedupeStore
+    from app.core.events import EventBus
+    from app.core.session_store_mysql import MySQLSessionStore
+    from app.plugins.registry import ToolRegistry
+
+    # DDL idempotente: salteable (DB_BOOTSTRAP=0) cuando el schema lo maneja
+    # otra cosa; corre en un thread para no colgar el arranque del loop.
+    if settings.DB_BOOTSTRAP:
+        await asyncio.to_thread(ensure_tables, engine)
+
+    orchestrator = AgentOrchestrator(
+        settings=settings,
+        tool_registry=ToolRegistry.from_settings(settings),
+        session_store=MySQLSessionStore(ttl_sec=settings.SESSION_TTL_SEC),
+        dedupe_store=BatchedDedupeStore(MySQLDedupeStore(ttl_sec_default=settings.DEDUPE_TTL_SEC)),
+        event_bus=EventBus(writer=MySQLAuditWriter(), keep_in_memory=settings.ENV != "prod"),
+    )
+    app.state.orchestrator = orchestrator
 
+    yield
 
+    await orchestrator.ollama.aclose()
 
 
 def create_app() -> FastAPI:
     configure_logging(env=settings.ENV)
 
-    app = FastAPI(title=settings.APP_NAME)
-
-    # Startup: asegurar tablas
-    @app.on_event("startup")
-    def startup() -> None:
-        ensure_tables(engine)
+    app = FastAPI(title=settings.APP_NAME, lifespan=lifespan, default_response_class=ORJSONResponse)
 
     # CORS (ajustar en prod)
     app.add_middleware(
@@ -46,10 +73,13 @@ def create_app() -> FastAPI:
 
     app.include_router(health_router)
     app.include_router(agent_router)
-    app.include_router(db_test_router)
-    app.include_router(llm_test_router)
-    app.include_router(planner_test_router)
     app.include_router(admin_cleanup_router)
+
+    # Endpoints de diagnóstico: solo fuera de prod
+    if settings.ENV != "prod":
+        app.include_router(db_test_router)
+        app.include_router(llm_test_router)
+        app.include_router(planner_test_router)
     app.add_middleware(RateLimitIPMiddleware)
 
     return app
@@ -58,4 +88,6 @@ def create_app() -> FastAPI:
 app = create_app()
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host=settings.HOST, port=settings.PORT, reload=(settings.ENV == "dev"))
\ No newline at end of file
+    import uvicorn
+
+    uvicorn.run("app.main:app", host=settings.HOST, port=settings.PORT, reload=(settings.ENV == "dev"))
@@ -1,18 +1,153 @@
 from __future__ import annotations
 
+import time as time_mod
 from typing import Any, Dict, List, Optional, Type
 from datetime import datetime, date, time, timedelta
 
+import orjson
 from pydantic import BaseModel, Field
 from sqlalchemy import text
 
-from app.infra.db import engine  # ✅ usar el engine global
+from app.infra.db import async_engine  # ✅ engine async global: no bloquea el event loop
 
 
 
 
 SLOT_MIN = 15
 
+# Cache TTL in-process para lookups casi estáticos: services/staff cambian
+# rarísimo y cada miss es un round-trip entero a MySQL.
+_LOOKUP_TTL_SEC = 300
+_svc_cache: Dict[str, tuple[float, int]] = {}
+_staff_cache: Dict[str, tuple[float, Optional[int]]] = {}
+
+
+def invalidate_lookup_caches() -> None:
+    """Limpiar los caches si se cambia services.active / staff (admin)."""
+    _svc_cache.clear()
+    _staff_cache.clear()
+
+
+def _cache_get(cache, key):
+    item = cache.get(key)
+    if item is None:
+        return None
+    if time_mod.monotonic() - item[0] > _LOOKUP_TTL_SEC:
+        cache.pop(key, None)
+        return None
+    return item
+
+
+# Statements pre-armados a nivel módulo: text() se parsea una sola vez
+_Q_SVC_DURATION = text("SELECT duration_min FROM services WHERE code=:code AND active=1 LIMIT 1")
+_Q_STAFF_ID = text("SELECT id FROM staff WHERE name=:name AND active=1 LIMIT 1")
+_Q_SVC_AND_STAFF = text("""
+    SELECT
+      (SELECT duration_min FROM services WHERE code=:code AND active=1 LIMIT 1) AS duration_min,
+      (SELECT id FROM staff WHERE name=:name AND active=1 LIMIT 1) AS staff_id
+""")
+_Q_BUSY_STARTS = text("""
+    SELECT start_at
+    FROM appointments
+    WHERE staff_id = :staff_id
+      AND status = 'booked'
+      AND start_at >= :start_day AND start_at < :end_day
+""")
+_Q_INSERT_APPT = text("""
+    INSERT INTO appointments
+      (patient_session_id, patient_name, service_code, staff_id, start_at, end_at, status, notes)
+    VALUES
+      (:session_id, :patient_name, :service_code, :staff_id, :start_at, :end_at, 'booked', :notes)
+""")
+# Variante atómica con guard de conflicto: el NOT EXISTS y el INSERT son un
+# solo statement, sin ventana check-then-insert entre dos requests
+_Q_INSERT_APPT_GUARDED = text("""
+    INSERT INTO appointments
+      (patient_session_id, patient_name, service_code, staff_id, start_at, end_at, status, notes)
+    SELECT :session_id, :patient_name, :service_code, :staff_id, :start_at, :end_at, 'booked', :notes
+    FROM DUAL
+    WHERE NOT EXISTS (
+        SELECT 1 FROM appointments
+        WHERE staff_id = :staff_id AND status = 'booked' AND start_at = :start_at
+    )
+""")
+# Agregación JSON server-side: una fila con el array ya armado en vez de
+# N filas + N dicts en Python. DATE_FORMAT replica isoformat(minutes).
+_LIST_APPT_JSON_OBJECT = """
+    JSON_ARRAYAGG(JSON_OBJECT(
+        'appointment_id', id,
+        'service', service_code,
+        'start', DATE_FORMAT(start_at, '%Y-%m-%dT%H:%i'),
+        'end', DATE_FORMAT(end_at, '%Y-%m-%dT%H:%i'),
+        'status', status,
+        'staff_id', staff_id
+    ))
+"""
+_Q_LIST_APPTS = {
+    # True = filtra por status, False = todos
+    True: text(f"""
+        SELECT {_LIST_APPT_JSON_OBJECT}
+        FROM (
+            SELECT id, service_code, start_at, end_at, status, staff_id
+            FROM appointments
+            WHERE patient_session_id = :session_id
+              AND status = :status
+            ORDER BY start_at ASC
+            LIMIT :limit
+        ) t
+    """),
+    False: text(f"""
+        SELECT {_LIST_APPT_JSON_OBJECT}
+        FROM (
+            SELECT id, service_code, start_at, end_at, status, staff_id
+            FROM appointments
+            WHERE patient_session_id = :session_id
+            ORDER BY start_at ASC
+            LIMIT :limit
+        ) t
+    """),
+}
+_Q_NEXT_BOOKED = text("""
+    SELECT id
+    FROM appointments
+    WHERE patient_session_id = :sid
+      AND status = 'booked'
+      AND start_at >= NOW()
+    ORDER BY start_at ASC
+    LIMIT 1
+""")
+_Q_CHECK_APPT = text("""
+    SELECT id, service_code, start_at, end_at, status
+    FROM appointments
+    WHERE id = :id AND patient_session_id = :sid
+    LIMIT 1
+""")
+_Q_CANCEL_APPT = text("""
+    UPDATE appointments
+    SET status='cancelled', notes = CONCAT(IFNULL(notes,''), :note)
+    WHERE id=:id AND patient_session_id=:sid
+""")
+_Q_RESCHED_LOOKUP = text("""
+    SELECT id, service_code, staff_id, status
+    FROM appointments
+    WHERE id = :id AND patient_session_id = :sid
+    LIMIT 1
+""")
+_Q_CONFLICT = text("""
+    SELECT id
+    FROM appointments
+    WHERE staff_id = :staff_id
+      AND status='booked'
+      AND start_at = :start_at
+      AND id <> :id
+    LIMIT 1
+""")
+_Q_RESCHED_UPD = text("""
+    UPDATE appointments
+    SET staff_id=:staff_id, start_at=:start_at, end_at=:end_at
+    WHERE id=:id AND patient_session_id=:sid
+""")
+
 
 class GetAvailabilityInput(BaseModel):
     service: str = Field(..., description="Servicio: limpieza|consulta|urgencia|extraccion")
@@ -53,66 +188,107 @@ def _parse_time(t: str) -> time:
 def _dt(d: date, t: time) -> datetime:
     return datetime.combine(d, t)
 
-def _business_windows(day: date):
-    dow = day.weekday()  # 0=Mon
-    if dow == 6:  # Domingo
-        return []
-    if dow == 5:  # Sábado
-        return [(_dt(day, _parse_time("09:00")), _dt(day, _parse_time("12:00")))]
-    return [
-        (_dt(day, _parse_time("09:00")), _dt(day, _parse_time("13:00"))),
-        (_dt(day, _parse_time("16:00")), _dt(day, _parse_time("20:00"))),
-    ]
+# Ventanas de atención precomputadas a import: _parse_time por llamada pagaba
+# un strptime (caro) para horarios que nunca cambian en runtime.
+_T_09 = time(9, 0)
+_T_12 = time(12, 0)
+_T_13 = time(13, 0)
+_T_16 = time(16, 0)
+_T_20 = time(20, 0)
 
-def _service_duration_min(service_code: str) -> int:
-    q = text("SELECT duration_min FROM services WHERE code=:code AND active=1 LIMIT 1")
-    with engine.begin() as conn:
-        row = conn.execute(q, {"code": service_code}).fetchone()
+_WEEKDAY_WINDOWS = ((_T_09, _T_13), (_T_16, _T_20))
+_WINDOWS_BY_DOW = {
+    5: ((_T_09, _T_12),),  # Sábado
+    6: (),                 # Domingo
+}
+
+def _business_windows(day: date):
+    windows = _WINDOWS_BY_DOW.get(day.weekday(), _WEEKDAY_WINDOWS)
+    return [(_dt(day, s), _dt(day, e)) for s, e in windows]
+
+async def _service_duration_min(service_code: str, conn=None) -> int:
+    cached = _cache_get(_svc_cache, service_code)
+    if cached is not None:
+        return cached[1]
+
+    # Lecturas puras: sin begin() (evita BEGIN/COMMIT por SELECT);
+    # se puede pasar una conexión compartida para encadenar lookups.
+    q = _Q_SVC_DURATION
+    if conn is not None:
+        row = (await conn.execute(q, {"code": service_code})).fetchone()
+    else:
+        async with async_engine.connect() as c:
+            row = (await c.execute(q, {"code": service_code})).fetchone()
     if not row:
         raise ValueError(f"Servicio inválido o inactivo: {service_code}")
-    return int(row[0])
-
-def _staff_id_by_name(staff_name: str) -> Optional[int]:
-    q = text("SELECT id FROM staff WHERE name=:name AND active=1 LIMIT 1")
-    with engine.begin() as conn:
-        row = conn.execute(q, {"name": staff_name}).fetchone()
-    return int(row[0]) if row else None
-
-def _busy_starts(staff_id: Optional[int], day: date) -> set[datetime]:
+    duration = int(row[0])
+    _svc_cache[service_code] = (time_mod.monotonic(), duration)
+    return duration
+
+async def _staff_id_by_name(staff_name: str, conn=None) -> Optional[int]:
+    cached = _cache_get(_staff_cache, staff_name)
+    if cached is not None:
+        return cached[1]
+
+    q = _Q_STAFF_ID
+    if conn is not None:
+        row = (await conn.execute(q, {"name": staff_name})).fetchone()
+    else:
+        async with async_engine.connect() as c:
+            row = (await c.execute(q, {"name": staff_name})).fetchone()
+    staff_id = int(row[0]) if row else None
+    _staff_cache[staff_name] = (time_mod.monotonic(), staff_id)
+    return staff_id
+
+async def _service_and_staff(service_code: str, staff_name: str, conn) -> tuple[Optional[int], Optional[int]]:
+    """Duración del servicio + id del profesional en UN solo round-trip."""
+    svc_hit = _cache_get(_svc_cache, service_code)
+    staff_hit = _cache_get(_staff_cache, staff_name)
+    if svc_hit is not None and staff_hit is not None:
+        return svc_hit[1], staff_hit[1]
+
+    row = (await conn.execute(_Q_SVC_AND_STAFF, {"code": service_code, "name": staff_name})).fetchone()
+    duration = int(row[0]) if row and row[0] is not None else None
+    staff_id = int(row[1]) if row and row[1] is not None else None
+    now = time_mod.monotonic()
+    if duration is not None:
+        _svc_cache[service_code] = (now, duration)
+    _staff_cache[staff_name] = (now, staff_id)
+    return duration, staff_id
+
+async def _busy_starts(staff_id: Optional[int], day: date, conn=None) -> set[datetime]:
     if staff_id is None:
         return set()
-    start_day = _dt(day, _parse_time("00:00"))
+    start_day = _dt(day, time.min)
     end_day = start_day + timedelta(days=1)
-    q = text("""
-        SELECT start_at
-        FROM appointments
-        WHERE staff_id = :staff_id
-          AND status = 'booked'
-          AND start_at >= :start_day AND start_at < :end_day
-    """)
-    with engine.begin() as conn:
-        rows = conn.execute(q, {"staff_id": staff_id, "start_day": start_day, "end_day": end_day}).fetchall()
+    params = {"staff_id": staff_id, "start_day": start_day, "end_day": end_day}
+    if conn is not None:
+        rows = (await conn.execute(_Q_BUSY_STARTS, params)).fetchall()
+    else:
+        async with async_engine.connect() as c:
+            rows = (await c.execute(_Q_BUSY_STARTS, params)).fetchall()
     return {r[0] for r in rows}
 
-def _insert_appointment(session_id: str, service: str, staff_id: Optional[int],
-                        start_at: datetime, end_at: datetime,
-                        patient_name: Optional[str], notes: Optional[str]) -> int:
-    q = text("""
-        INSERT INTO appointments
-          (patient_session_id, patient_name, service_code, staff_id, start_at, end_at, status, notes)
-        VALUES
-          (:session_id, :patient_name, :service_code, :staff_id, :start_at, :end_at, 'booked', :notes)
-    """)
-    with engine.begin() as conn:
-        res = conn.execute(q, {
-            "session_id": session_id,
-            "patient_name": patient_name,
-            "service_code": service,
-            "staff_id": staff_id,
-            "start_at": start_at,
-            "end_at": end_at,
-            "notes": notes,
-        })
+async def _insert_appointment(session_id: str, service: str, staff_id: Optional[int],
+                              start_at: datetime, end_at: datetime,
+                              patient_name: Optional[str], notes: Optional[str]) -> Optional[int]:
+    """Devuelve el id insertado, o None si el horario ya estaba tomado."""
+    params = {
+        "session_id": session_id,
+        "patient_name": patient_name,
+        "service_code": service,
+        "staff_id": staff_id,
+        "start_at": start_at,
+        "end_at": end_at,
+        "notes": notes,
+    }
+    # Con staff asignado, el guard NOT EXISTS evita doble-booking del mismo
+    # horario en forma atómica; sin staff no hay recurso que colisione.
+    q = _Q_INSERT_APPT if staff_id is None else _Q_INSERT_APPT_GUARDED
+    async with async_engine.begin() as conn:
+        res = await conn.execute(q, params)
+        if not res.rowcount:
+            return None
         return int(res.lastrowid)
 
 
@@ -132,29 +308,47 @@ class GetAvailabilityTool:
         day = _parse_date(a.date.strip())
         staff_name = (a.staff or "").strip()
 
-        duration_min = _service_duration_min(service)
-
-        staff_id = None
-        if staff_name:
-            staff_id = _staff_id_by_name(staff_name)
-            if staff_id is None:
-                return {"ok": False, "error": f"Profesional no encontrado: {staff_name}"}
-
-        busy = _busy_starts(staff_id, day)
+        # Una sola conexión para las 2-3 lecturas del path. Con los lookups
+        # cacheados esto suele ser UN round-trip (busy_starts); generar los
+        # slots con un WITH RECURSIVE en MySQL no ahorraría viajes y movería
+        # la lógica de ventanas de negocio a SQL difícil de mantener.
+        async with async_engine.connect() as conn:
+            if staff_name:
+                duration_min, staff_id = await _service_and_staff(service, staff_name, conn)
+                if duration_min is None:
+                    raise ValueError(f"Servicio inválido o inactivo: {service}")
+                if staff_id is None:
+                    return {"ok": False, "error": f"Profesional no encontrado: {staff_name}"}
+            else:
+                duration_min = await _service_duration_min(service, conn)
+                staff_id = None
+
+            busy = await _busy_starts(staff_id, day, conn)
+
+        # Enumeración sobre minutos-del-día enteros: range() genera los
+        # candidatos en C, el set-diff descarta ocupados, y el ISO se arma con
+        # f-strings desde el prefijo de fecha precalculado (isoformat por slot
+        # era lo más caro del loop).
+        busy_minutes = {t.hour * 60 + t.minute for t in busy}
+        base_iso = day.isoformat()
 
         slots: List[Dict[str, Any]] = []
+        staff_label = staff_name or None
         for w_start, w_end in _business_windows(day):
-            cursor = w_start
-            while cursor + timedelta(minutes=duration_min) <= w_end:
-                if (staff_id is None) or (cursor not in busy):
-                    slots.append({
-                        "start": cursor.isoformat(timespec="minutes"),
-                        "end": (cursor + timedelta(minutes=duration_min)).isoformat(timespec="minutes"),
-                        "service": service,
-                        "duration_min": duration_min,
-                        "staff": staff_name or None,
-                    })
-                cursor += timedelta(minutes=SLOT_MIN)
+            ws = w_start.hour * 60 + w_start.minute
+            we = w_end.hour * 60 + w_end.minute
+            candidates = range(ws, we - duration_min + 1, SLOT_MIN)
+            if staff_id is not None and busy_minutes:
+                candidates = [m for m in candidates if m not in busy_minutes]
+            for m in candidates:
+                e = m + duration_min
+                slots.append({
+                    "start": f"{base_iso}T{m // 60:02d}:{m % 60:02d}",
+                    "end": f"{base_iso}T{e // 60:02d}:{e % 60:02d}",
+                    "service": service,
+                    "duration_min": duration_min,
+                    "staff": staff_label,
+                })
 
         return {"ok": True, "slots": slots, "count": len(slots)}
 
@@ -174,17 +368,22 @@ class CreateAppointmentTool:
 
         service = a.service.strip().lower()
         start_at = datetime.fromisoformat(a.start.strip())
-        duration_min = _service_duration_min(service)
-        end_at = start_at + timedelta(minutes=duration_min)
 
-        staff_id = None
         staff_name = (a.staff or "").strip()
-        if staff_name:
-            staff_id = _staff_id_by_name(staff_name)
-            if staff_id is None:
-                return {"ok": False, "error": f"Profesional no encontrado: {staff_name}"}
+        async with async_engine.connect() as conn:
+            if staff_name:
+                duration_min, staff_id = await _service_and_staff(service, staff_name, conn)
+                if duration_min is None:
+                    raise ValueError(f"Servicio inválido o inactivo: {service}")
+                if staff_id is None:
+                    return {"ok": False, "error": f"Profesional no encontrado: {staff_name}"}
+            else:
+                duration_min = await _service_duration_min(service, conn)
+                staff_id = None
 
-        appt_id = _insert_appointment(
+        end_at = start_at + timedelta(minutes=duration_min)
+
+        appt_id = await _insert_appointment(
             session_id=session_id,
             service=service,
             staff_id=staff_id,
@@ -193,6 +392,8 @@ class CreateAppointmentTool:
             patient_name=a.patient_name,
             notes=a.notes,
         )
+        if appt_id is None:
+            return {"ok": False, "error": "Ese horario ya está ocupado para ese profesional."}
         return {"ok": True, "appointment_id": appt_id, "status": "booked"}
 
 
@@ -212,38 +413,21 @@ class ListAppointmentsTool:
         status = (a.status or "booked").strip().lower()
         limit = int(a.limit)
 
-        where_status = ""
         params: Dict[str, Any] = {"session_id": session_id, "limit": limit}
-
-        if status != "all":
-            where_status = "AND status = :status"
+        filter_status = status != "all"
+        if filter_status:
             params["status"] = status
 
-        q = text(f"""
-            SELECT id, service_code, start_at, end_at, status, staff_id
-            FROM appointments
-            WHERE patient_session_id = :session_id
-              {where_status}
-            ORDER BY start_at ASC
-            LIMIT :limit
-        """)
-
-        with engine.begin() as conn:
-            rows = conn.execute(q, params).fetchall()
-
-        appts = []
-        for r in rows:
-            appts.append({
-                "appointment_id": int(r[0]),
-                "service": r[1],
-                "start": r[2].isoformat(timespec="minutes"),
-                "end": r[3].isoformat(timespec="minutes"),
-                "status": r[4],
-                "staff_id": r[5],
-            })
+        async with async_engine.connect() as conn:
+            raw = (await conn.execute(_Q_LIST_APPTS[filter_status], params)).scalar()
+
+        appts = orjson.loads(raw) if raw else []
+        # JSON_ARRAYAGG no garantiza el orden del derived table: reordenamos
+        # acá (son <= 20 items, costo trivial)
+        appts.sort(key=lambda x: x["start"])
 
         return {"ok": True, "appointments": appts, "count": len(appts)}
-    
+
 class CancelAppointmentTool:
     name = "cancel_appointment"
     description = (
@@ -260,54 +444,30 @@ class CancelAppointmentTool:
 
         appt_id = a.appointment_id
 
-        # Si pide cancelar próximo
-        if not appt_id and a.cancel_next:
-            q = text("""
-                SELECT id
-                FROM appointments
-                WHERE patient_session_id = :sid
-                  AND status = 'booked'
-                  AND start_at >= NOW()
-                ORDER BY start_at ASC
-                LIMIT 1
-            """)
-            with engine.begin() as conn:
-                row = conn.execute(q, {"sid": session_id}).fetchone()
-            if not row:
-                return {"ok": False, "error": "No encontré un turno próximo para cancelar."}
-            appt_id = int(row[0])
+        note = f"\n[CANCEL] {a.reason}" if a.reason else "\n[CANCEL]"
 
-        if not appt_id:
-            return {"ok": False, "error": "Falta appointment_id o cancel_next=true"}
+        # Una sola transacción para lookup + verificación + update: sin la
+        # ventana entre el check y el UPDATE (y una sola conexión del pool)
+        async with async_engine.begin() as conn:
+            # Si pide cancelar próximo
+            if not appt_id and a.cancel_next:
+                row = (await conn.execute(_Q_NEXT_BOOKED, {"sid": session_id})).fetchone()
+                if not row:
+                    return {"ok": False, "error": "No encontré un turno próximo para cancelar."}
+                appt_id = int(row[0])
 
-        # Verificar que el turno sea del paciente y esté booked
-        q_check = text("""
-            SELECT id, service_code, start_at, end_at, status
-            FROM appointments
-            WHERE id = :id AND patient_session_id = :sid
-            LIMIT 1
-        """)
-        with engine.begin() as conn:
-            row = conn.execute(q_check, {"id": appt_id, "sid": session_id}).fetchone()
+            if not appt_id:
+                return {"ok": False, "error": "Falta appointment_id o cancel_next=true"}
 
-        if not row:
-            return {"ok": False, "error": "Turno no encontrado para tu sesión."}
-        if row[4] != "booked":
-            return {"ok": False, "error": f"El turno no está activo (status={row[4]})."}
-
-        q_upd = text("""
-            UPDATE appointments
-            SET status='cancelled', notes = CONCAT(IFNULL(notes,''), :note)
-            WHERE id=:id AND patient_session_id=:sid
-        """)
-        note = ""
-        if a.reason:
-            note = f"\n[CANCEL] {a.reason}"
-        else:
-            note = "\n[CANCEL]"
-
-        with engine.begin() as conn:
-            conn.execute(q_upd, {"id": appt_id, "sid": session_id, "note": note})
+            # Verificar que el turno sea del paciente y esté booked
+            row = (await conn.execute(_Q_CHECK_APPT, {"id": appt_id, "sid": session_id})).fetchone()
+
+            if not row:
+                return {"ok": False, "error": "Turno no encontrado para tu sesión."}
+            if row[4] != "booked":
+                return {"ok": False, "error": f"El turno no está activo (status={row[4]})."}
+
+            await conn.execute(_Q_CANCEL_APPT, {"id": appt_id, "sid": session_id, "note": note})
 
         return {
             "ok": True,
@@ -336,14 +496,8 @@ class RescheduleAppointmentTool:
         new_start_at = datetime.fromisoformat(a.new_start.strip())
 
         # Buscar turno y validar pertenencia
-        q = text("""
-            SELECT id, service_code, staff_id, status
-            FROM appointments
-            WHERE id = :id AND patient_session_id = :sid
-            LIMIT 1
-        """)
-        with engine.begin() as conn:
-            row = conn.execute(q, {"id": a.appointment_id, "sid": session_id}).fetchone()
+        async with async_engine.connect() as conn:
+            row = (await conn.execute(_Q_RESCHED_LOOKUP, {"id": a.appointment_id, "sid": session_id})).fetchone()
 
         if not row:
             return {"ok": False, "error": "Turno no encontrado para tu sesión."}
@@ -357,41 +511,27 @@ class RescheduleAppointmentTool:
         staff_id = current_staff_id
         staff_name = (a.staff or "").strip()
         if staff_name:
-            sid = _staff_id_by_name(staff_name)
+            sid = await _staff_id_by_name(staff_name)
             if sid is None:
                 return {"ok": False, "error": f"Profesional no encontrado: {staff_name}"}
             staff_id = sid
 
-        duration_min = _service_duration_min(service)
+        duration_min = await _service_duration_min(service)
         new_end_at = new_start_at + timedelta(minutes=duration_min)
 
         # Chequeo simple de choque si hay staff_id
         if staff_id is not None:
-            q_conflict = text("""
-                SELECT id
-                FROM appointments
-                WHERE staff_id = :staff_id
-                  AND status='booked'
-                  AND start_at = :start_at
-                  AND id <> :id
-                LIMIT 1
-            """)
-            with engine.begin() as conn:
-                conflict = conn.execute(q_conflict, {
+            async with async_engine.connect() as conn:
+                conflict = (await conn.execute(_Q_CONFLICT, {
                     "staff_id": staff_id,
                     "start_at": new_start_at,
                     "id": a.appointment_id,
-                }).fetchone()
+                })).fetchone()
             if conflict:
                 return {"ok": False, "error": "Ese horario ya está ocupado para ese profesional."}
 
-        q_upd = text("""
-            UPDATE appointments
-            SET staff_id=:staff_id, start_at=:start_at, end_at=:end_at
-            WHERE id=:id AND patient_session_id=:sid
-        """)
-        with engine.begin() as conn:
-            conn.execute(q_upd, {
+        async with async_engine.begin() as conn:
+            await conn.execute(_Q_RESCHED_UPD, {
                 "staff_id": staff_id,
                 "start_at": new_start_at,
                 "end_at": new_end_at,
@@ -416,4 +556,4 @@ def register():
             ListAppointmentsTool(),
             CancelAppointmentTool(),
             RescheduleAppointmentTool(),
-    ]
\ No newline at end of file
+    ]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
 import re
 import hashlib
 import secrets
@@ -10,13 +12,75 @@ from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 from sqlalchemy import text
 
-from app.infra.db import get_db_session
+from app.core.logging import log_event
+from app.infra.db import get_async_db_session
 from app.plugins.base import Tool
 
 
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 
+# Statements pre-armados a nivel módulo (mismo patrón que appointments_tools):
+# text() se parsea una vez y el cache de compilación de SQLAlchemy pega por identidad
+_Q_UPSERT_CUSTOMER = text("""
+    INSERT INTO customers (display_name, email, phone, status)
+    VALUES (:display_name, :email, :phone, 'pending')
+    ON DUPLICATE KEY UPDATE
+      id = LAST_INSERT_ID(id),
+      display_name = IF(status = 'verified', display_name, VALUES(display_name)),
+      phone = IF(status = 'verified', phone, VALUES(phone)),
+      status = status
+""")
+_Q_CUSTOMER_STATUS = text("SELECT status FROM customers WHERE id = :id")
+_Q_CUSTOMER_BY_EMAIL = text("SELECT id, status FROM customers WHERE email = :email LIMIT 1")
+_Q_CUSTOMER_FULL_BY_EMAIL = text(
+    "SELECT id, status, display_name, phone FROM customers WHERE email = :email LIMIT 1"
+)
+# Emisión de código en UN statement: el UNIQUE (customer_id, code_active)
+# asegura un solo código vigente por cliente, y el ON DUPLICATE KEY lo pisa
+# en lugar del par invalidar + insertar (2 round-trips -> 1). Los códigos
+# consumidos (used_at seteado) quedan intactos como historial.
+_Q_UPSERT_CODE = text("""
+    INSERT INTO email_verifications (customer_id, code_hash, expires_at, attempts)
+    VALUES (:cid, :code_hash, :expires_at, 0)
+    ON DUPLICATE KEY UPDATE
+      code_hash = VALUES(code_hash),
+      expires_at = VALUES(expires_at),
+      attempts = 0,
+      created_at = CURRENT_TIMESTAMP
+""")
+_Q_CONSUME_CODE = text("""
+    UPDATE email_verifications
+    SET used_at = CURRENT_TIMESTAMP
+    WHERE customer_id = :cid
+      AND used_at IS NULL
+      AND expires_at >= :now
+      AND attempts < :max_attempts
+      AND code_hash = :code_hash
+""")
+_Q_MARK_VERIFIED = text(
+    "UPDATE customers SET status='verified', updated_at=CURRENT_TIMESTAMP WHERE id = :cid"
+)
+_Q_BUMP_ATTEMPTS = text("""
+    UPDATE email_verifications
+    SET attempts = attempts + 1
+    WHERE customer_id = :cid
+      AND used_at IS NULL
+      AND expires_at >= :now
+      AND attempts < :max_attempts
+""")
+_Q_ACTIVE_CODE_STATE = text("""
+    SELECT expires_at, attempts
+    FROM email_verifications
+    WHERE customer_id = :cid AND used_at IS NULL
+    LIMIT 1
+""")
+
+# Pepper cacheado a import: os.getenv por hash era costo repetido en el path
+# caliente de verificación (el proceso se reinicia si rota el secreto).
+_PEPPER = os.getenv("EMAIL_CODE_PEPPER", "dev-pepper-change-me").encode("utf-8")
+
+
 def _now_utc_naive() -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
@@ -26,13 +90,58 @@ def _normalize_email(email: str) -> str:
 
 
 def _hash_code(code: str) -> str:
-    pepper = os.getenv("EMAIL_CODE_PEPPER", "dev-pepper-change-me")
-    raw = f"{pepper}:{code}".encode("utf-8")
-    return hashlib.sha256(raw).hexdigest()
+    # hex porque la columna code_hash es CHAR(64). La comparación la hace
+    # MySQL (code_hash = :hash en el UPDATE condicional del verify): no es
+    # constant-time, pero compara hashes con pepper secreto — sin el pepper
+    # un timing oracle sobre el hash no acerca al código original.
+    return hashlib.sha256(_PEPPER + b":" + code.encode("utf-8")).hexdigest()
+
+
+# Pool de códigos pre-generados: una sola lectura de entropía (token_bytes)
+# rinde 256 códigos; randbelow pagaba un syscall de urandom por código.
+_CODE_POOL: list[str] = []
+_CODE_POOL_LOCK = threading.Lock()
+
+
+def _refill_code_pool(n: int = 256) -> None:
+    raw = secrets.token_bytes(4 * n)
+    _CODE_POOL.extend(
+        f"{int.from_bytes(raw[i * 4:(i + 1) * 4], 'big') % 1_000_000:06d}"
+        for i in range(n)
+    )
 
 
 def _generate_code_6() -> str:
-    return f"{secrets.randbelow(1_000_000):06d}"
+    with _CODE_POOL_LOCK:
+        if not _CODE_POOL:
+            _refill_code_pool()
+        return _CODE_POOL.pop()
+
+
+# Referencias vivas a los envíos en background (evita que el GC cancele tasks)
+_mail_tasks: set[asyncio.Task] = set()
+
+
+def _on_mail_done(task: asyncio.Task) -> None:
+    _mail_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        # El caller ya respondió email_sent=True (= encolado): el fallo solo
+        # puede verse acá; el usuario se recupera con resend_verification_code
+        log_event("mail_send_failed", to=task.get_name(), error=str(exc))
+
+
+def _send_mail_background(mailer, to: str, subject: str, body: str) -> None:
+    """
+    El SMTP (200-2000ms) sale del camino crítico del request.
+    email_sent=True en la respuesta significa "encolado", no "entregado":
+    un fallo del envío se loguea desde el done-callback.
+    """
+    task = asyncio.create_task(mailer.send(to=to, subject=subject, body=body), name=to)
+    _mail_tasks.add(task)
+    task.add_done_callback(_on_mail_done)
 
 
 class RegisterCustomerArgs(BaseModel):
@@ -57,7 +166,7 @@ class RegisterCustomerTool:
 
     async def run(self, args: RegisterCustomerArgs, ctx: Dict[str, Any]) -> Dict[str, Any]:
         email = _normalize_email(args.email)
-        if not EMAIL_RE.match(email):
+        if not EMAIL_RE.fullmatch(email):
             return {"ok": False, "error": "invalid_email"}
 
         ttl_minutes = int(os.getenv("EMAIL_CODE_TTL_MINUTES", "15"))
@@ -65,58 +174,31 @@ class RegisterCustomerTool:
         code = _generate_code_6()
         code_hash = _hash_code(code)
 
-        db = get_db_session()
+        db = get_async_db_session()
         try:
-            row = db.execute(
-                text("SELECT id, status FROM customers WHERE email = :email LIMIT 1"),
-                {"email": email},
-            ).fetchone()
-
-            if row:
-                customer_id, status = row
-                if status == "verified":
-                    return {"ok": True, "customer_id": str(customer_id), "status": "verified"}
-                db.execute(
-                    text("""
-                        UPDATE customers
-                        SET display_name = :display_name,
-                            phone = :phone,
-                            status = 'pending',
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE id = :id
-                    """),
-                    {"display_name": args.display_name.strip(), "phone": args.phone, "id": customer_id},
-                )
-            else:
-                res = db.execute(
-                    text("""
-                        INSERT INTO customers (display_name, email, phone, status)
-                        VALUES (:display_name, :email, :phone, 'pending')
-                    """),
-                    {"display_name": args.display_name.strip(), "email": email, "phone": args.phone},
-                )
-                customer_id = res.lastrowid
-
-            # invalidar verificaciones anteriores pendientes
-            db.execute(
-                text("""
-                    UPDATE email_verifications
-                    SET used_at = COALESCE(used_at, CURRENT_TIMESTAMP)
-                    WHERE customer_id = :cid AND used_at IS NULL
-                """),
-                {"cid": customer_id},
+            # Upsert atómico: dos registros concurrentes del mismo email ya no
+            # chocan contra el UNIQUE (el SELECT+branch anterior era racy).
+            # LAST_INSERT_ID(id) hace que lastrowid traiga el id también en el
+            # camino de UPDATE; los IF preservan los datos de un verificado.
+            res = await db.execute(
+                _Q_UPSERT_CUSTOMER,
+                {"display_name": args.display_name.strip(), "email": email, "phone": args.phone},
             )
+            customer_id = res.lastrowid
+
+            status = (await db.execute(_Q_CUSTOMER_STATUS, {"id": customer_id})).scalar()
+            if status == "verified":
+                await db.commit()
+                return {"ok": True, "customer_id": str(customer_id), "status": "verified"}
 
-            db.execute(
-                text("""
-                    INSERT INTO email_verifications (customer_id, code_hash, expires_at, attempts)
-                    VALUES (:cid, :code_hash, :expires_at, 0)
-                """),
+            # emitir código (pisa el vigente si lo hay, en un solo statement)
+            await db.execute(
+                _Q_UPSERT_CODE,
                 {"cid": customer_id, "code_hash": code_hash, "expires_at": expires_at},
             )
-            db.commit()
+            await db.commit()
         finally:
-            db.close()
+            await db.close()
 
         # enviar email
         mailer = ctx.get("mailer")
@@ -131,7 +213,8 @@ class RegisterCustomerTool:
         if not mailer:
             return {"ok": False, "error": "mailer_not_configured"}
 
-        await mailer.send(to=email, subject=subject, body=body)
+        # email_sent = encolado: el usuario no espera el handshake SMTP
+        _send_mail_background(mailer, to=email, subject=subject, body=body)
 
         return {
             "ok": True,
@@ -152,17 +235,14 @@ class VerifyEmailCodeTool:
         email = _normalize_email(args.email)
         code = (args.code or "").strip()
 
-        if not EMAIL_RE.match(email):
+        if not EMAIL_RE.fullmatch(email):
             return {"ok": False, "error": "invalid_email"}
         if not (len(code) == 6 and code.isdigit()):
             return {"ok": False, "error": "invalid_code_format"}
 
-        db = get_db_session()
+        db = get_async_db_session()
         try:
-            cust = db.execute(
-                text("SELECT id, status FROM customers WHERE email = :email LIMIT 1"),
-                {"email": email},
-            ).fetchone()
+            cust = (await db.execute(_Q_CUSTOMER_BY_EMAIL, {"email": email})).fetchone()
             if not cust:
                 return {"ok": False, "error": "invalid_code_or_expired"}
 
@@ -170,43 +250,38 @@ class VerifyEmailCodeTool:
             if status == "verified":
                 return {"ok": True, "customer_id": str(customer_id), "status": "verified"}
 
-            ev = db.execute(
-                text("""
-                    SELECT id, code_hash, expires_at, attempts
-                    FROM email_verifications
-                    WHERE customer_id = :cid AND used_at IS NULL
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                """),
-                {"cid": customer_id},
-            ).fetchone()
-
-            if not ev:
-                return {"ok": False, "error": "invalid_code_or_expired"}
-
-            ev_id, code_hash, expires_at, attempts = ev
             now = _now_utc_naive()
+            max_attempts = int(os.getenv("EMAIL_CODE_MAX_ATTEMPTS", "5"))
 
-            if expires_at < now:
-                return {"ok": False, "error": "invalid_code_or_expired"}
+            # Compare-and-set: un solo UPDATE condicional consume el código
+            # vigente (hay a lo sumo uno con used_at IS NULL por la
+            # invalidación del register/resend) si coincide el hash, no venció
+            # y quedan intentos. Sin ventana entre chequear y consumir.
+            res = await db.execute(
+                _Q_CONSUME_CODE,
+                {"cid": customer_id, "now": now, "max_attempts": max_attempts, "code_hash": _hash_code(code)},
+            )
 
-            max_attempts = int(os.getenv("EMAIL_CODE_MAX_ATTEMPTS", "5"))
-            if attempts >= max_attempts:
-                return {"ok": False, "error": "too_many_attempts"}
+            if res.rowcount:
+                await db.execute(_Q_MARK_VERIFIED, {"cid": customer_id})
+                await db.commit()
+                return {"ok": True, "customer_id": str(customer_id), "status": "verified"}
 
-            if _hash_code(code) != code_hash:
-                db.execute(text("UPDATE email_verifications SET attempts = attempts + 1 WHERE id = :id"), {"id": ev_id})
-                db.commit()
-                return {"ok": False, "error": "invalid_code_or_expired"}
+            # Miss: sumar intento solo si el código sigue vivo, y recién después
+            # mirar el estado para elegir el error
+            await db.execute(
+                _Q_BUMP_ATTEMPTS,
+                {"cid": customer_id, "now": now, "max_attempts": max_attempts},
+            )
+            await db.commit()
 
-            db.execute(text("UPDATE email_verifications SET used_at = CURRENT_TIMESTAMP WHERE id = :id"), {"id": ev_id})
-            db.execute(text("UPDATE customers SET status='verified', updated_at=CURRENT_TIMESTAMP WHERE id = :cid"),
-                       {"cid": customer_id})
-            db.commit()
+            ev = (await db.execute(_Q_ACTIVE_CODE_STATE, {"cid": customer_id})).fetchone()
 
-            return {"ok": True, "customer_id": str(customer_id), "status": "verified"}
+            if ev and ev[0] >= now and ev[1] >= max_attempts:
+                return {"ok": False, "error": "too_many_attempts"}
+            return {"ok": False, "error": "invalid_code_or_expired"}
         finally:
-            db.close()
+            await db.close()
 
 
 class ResendVerificationCodeTool:
@@ -217,7 +292,7 @@ class ResendVerificationCodeTool:
 
     async def run(self, args: ResendVerificationCodeArgs, ctx: Dict[str, Any]) -> Dict[str, Any]:
         email = _normalize_email(args.email)
-        if not EMAIL_RE.match(email):
+        if not EMAIL_RE.fullmatch(email):
             return {"ok": False, "error": "invalid_email"}
 
         ttl_minutes = int(os.getenv("EMAIL_CODE_TTL_MINUTES", "15"))
@@ -226,12 +301,9 @@ class ResendVerificationCodeTool:
         code = _generate_code_6()
         code_hash = _hash_code(code)
 
-        db = get_db_session()
+        db = get_async_db_session()
         try:
-            row = db.execute(
-                text("SELECT id, status, display_name, phone FROM customers WHERE email = :email LIMIT 1"),
-                {"email": email},
-            ).fetchone()
+            row = (await db.execute(_Q_CUSTOMER_FULL_BY_EMAIL, {"email": email})).fetchone()
 
             if not row:
                 return {"ok": False, "error": "not_found"}
@@ -240,26 +312,14 @@ class ResendVerificationCodeTool:
             if status == "verified":
                 return {"ok": True, "customer_id": str(customer_id), "status": "verified", "message": "Ya está verificado."}
 
-            # invalidar verificaciones anteriores pendientes
-            db.execute(
-                text("""
-                    UPDATE email_verifications
-                    SET used_at = COALESCE(used_at, CURRENT_TIMESTAMP)
-                    WHERE customer_id = :cid AND used_at IS NULL
-                """),
-                {"cid": customer_id},
-            )
-
-            db.execute(
-                text("""
-                    INSERT INTO email_verifications (customer_id, code_hash, expires_at, attempts)
-                    VALUES (:cid, :code_hash, :expires_at, 0)
-                """),
+            # emitir código (pisa el vigente si lo hay, en un solo statement)
+            await db.execute(
+                _Q_UPSERT_CODE,
                 {"cid": customer_id, "code_hash": code_hash, "expires_at": expires_at},
             )
-            db.commit()
+            await db.commit()
         finally:
-            db.close()
+            await db.close()
 
         mailer = ctx.get("mailer")
         if not mailer:
@@ -272,7 +332,7 @@ class ResendVerificationCodeTool:
             f"Vence en {ttl_minutes} minutos.\n\n"
             f"Si no fuiste vos, ignorá este email.\n"
         )
-        await mailer.send(to=email, subject=subject, body=body)
+        _send_mail_background(mailer, to=email, subject=subject, body=body)
 
         resp = {
             "ok": True,
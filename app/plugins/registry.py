@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
 
 from app.infra.utils import import_from_path
 from app.plugins.base import Tool
@@ -9,6 +12,16 @@ from app.plugins.base import Tool
 class ToolRegistry:
     def __init__(self):
         self._tools: Dict[str, Tool] = {}
+        # (props, required) por tool, extraído UNA vez al registrar: el build
+        # del JSON schema de Pydantic es lo caro de describir el catálogo
+        self._schema_cache: Dict[str, tuple[Dict[str, Any], List[str]]] = {}
+        # Línea de catálogo ya renderizada por tool (scopes/desc/args no
+        # cambian post-registro): describir es solo un join
+        self._line_cache: Dict[str, str] = {}
+        # El catálogo solo cambia al registrar tools: versionamos y cacheamos
+        self._version = 0
+        self._describe_cache: tuple[int, str] | None = None
+        self._list_cache: tuple[int, Tuple[Tool, ...]] | None = None
 
     @classmethod
     def from_settings(cls, settings: Any) -> "ToolRegistry":
@@ -22,57 +35,81 @@ class ToolRegistry:
         """
         tools puede ser list[Tool] o dict[name, Tool]
         """
+        # sys.intern en las keys: el lookup por nombre en get() pega por
+        # identidad de puntero en el fast-path del dict de CPython
         if isinstance(tools, dict):
-            items = tools.items()
+            incoming = {sys.intern(name): tool for name, tool in tools.items()}
         else:
-            items = [(t.name, t) for t in tools]
+            incoming = {sys.intern(t.name): t for t in tools}
+        # Flags precalculados por tool: checks O(1) para scopes/confirmación
+        # en catálogo, orchestrator y auditoría
+        for tool in incoming.values():
+            tool._scopes_set = frozenset(getattr(tool, "scopes", None) or ())
+            tool._requires_confirmation = "write" in tool._scopes_set
+            # Adapter compilado para validar args por llamada vía pydantic-core
+            tool._args_adapter = TypeAdapter(tool.input_model)
+
+        # dict.update en C (sin loop interpretado por par nombre/tool)
+        self._tools.update(incoming)
+        self._schema_cache.update(
+            (name, self._extract_schema(tool)) for name, tool in incoming.items()
+        )
+        self._line_cache.update(
+            (name, self._render_tool_line(tool, *self._schema_cache[name]))
+            for name, tool in incoming.items()
+        )
+        self._version += 1
 
-        for name, tool in items:
-            self._tools[name] = tool
+    @staticmethod
+    def _render_tool_line(tool: Tool, args_schema: Dict[str, Any], required: List[str]) -> str:
+        scopes = ",".join(tool.scopes or [])
+        confirm_note = " (requires_confirmation)" if tool._requires_confirmation else ""
+
+        # Formateo args (generator directo al join: sin lista intermedia)
+        if not args_schema:
+            args_desc = "args: (none)"
+        else:
+            args_desc = "args: " + "; ".join(
+                f"{fn}:{meta.get('type', 'any')} ({'required' if fn in required else 'optional'})"
+                + (f" - {meta['description']}" if meta.get("description") else "")
+                for fn, meta in args_schema.items()
+            )
+
+        return f"- {tool.name} ({scopes}){confirm_note}: {tool.description}\n  {args_desc}"
+
+    @staticmethod
+    def _extract_schema(tool: Tool) -> tuple[Dict[str, Any], List[str]]:
+        # Schema de args (Pydantic v2); se calcula al registrar, no por request.
+        # Solo AttributeError (tool sin input_model válido): un except amplio
+        # taparía bugs reales de Pydantic en las tools.
+        try:
+            schema = tool.input_model.model_json_schema()  # type: ignore[attr-defined]
+        except AttributeError:
+            return {}, []
+        return schema.get("properties", {}) or {}, schema.get("required", []) or []
 
     def get(self, name: str) -> Optional[Tool]:
-        return self._tools.get(name)
+        # Nombres que vienen del plan del LLM no están interned: normalizarlos
+        # acá mantiene el fast-path de identidad en el lookup
+        return self._tools.get(sys.intern(name))
 
-    def list(self) -> List[Tool]:
-        return list(self._tools.values())
+    def list(self) -> Sequence[Tool]:
+        # Tupla inmutable cacheada por versión: sin copia de lista por llamada
+        if self._list_cache is None or self._list_cache[0] != self._version:
+            self._list_cache = (self._version, tuple(self._tools.values()))
+        return self._list_cache[1]
 
     def describe_tools(self) -> str:
         """
         Catálogo para el planner (texto) incluyendo ARGS reales desde el input_model.
 
         Esto evita que el LLM invente nombres de parámetros.
+        Memoizado por versión del registry: se rearma solo si cambian las tools.
         """
-        lines: List[str] = []
-        for t in self.list():
-            scopes = ",".join(t.scopes or [])
-            confirm_note = " (requires_confirmation)" if "write" in (t.scopes or []) else ""
-
-            # Schema de args (Pydantic v2)
-            args_schema = {}
-            required: List[str] = []
-            try:
-                schema = t.input_model.model_json_schema()  # type: ignore[attr-defined]
-                args_schema = schema.get("properties", {}) or {}
-                required = schema.get("required", []) or []
-            except Exception:
-                args_schema = {}
-                required = []
-
-            # Formateo args
-            if not args_schema:
-                args_desc = "args: (none)"
-            else:
-                parts: List[str] = []
-                for field_name, meta in args_schema.items():
-                    ftype = meta.get("type", "any")
-                    fdesc = meta.get("description", "")
-                    req = "required" if field_name in required else "optional"
-                    if fdesc:
-                        parts.append(f"{field_name}:{ftype} ({req}) - {fdesc}")
-                    else:
-                        parts.append(f"{field_name}:{ftype} ({req})")
-                args_desc = "args: " + "; ".join(parts)
-
-            lines.append(f"- {t.name} ({scopes}){confirm_note}: {t.description}\n  {args_desc}")
-
-        return "\n".join(lines)
\ No newline at end of file
+        if self._describe_cache is not None and self._describe_cache[0] == self._version:
+            return self._describe_cache[1]
+
+        # Las líneas ya se renderizaron al registrar; armamos en orden de registro
+        catalog = "\n".join(self._line_cache[name] for name in self._tools)
+        self._describe_cache = (self._version, catalog)
+        return catalog
\ No newline at end of file
@@ -1,14 +1,28 @@
 from __future__ import annotations
+
 from typing import List
 
+from app.core.logging import log_event
 from app.plugins.base import Tool
-from app.plugins.tools_mock import register as register_mock_tools
-from app.plugins.customer_registration_tools import register as register_customer_email_tools
-from app.plugins.appointments_tools import register as register_appointments_tools
+
 
 def provide_tools() -> List[Tool]:
+    # Imports diferidos: cada módulo de tools paga construcción de modelos
+    # Pydantic (y arrastra deps de DB/SMTP) al importarse. Si settings apunta
+    # a otro provider, este módulo se puede importar sin pagar nada de eso.
+    # Un set opcional que falla al importar se saltea con warning en vez de
+    # tirar abajo el arranque.
+    registrars = [
+        ("app.plugins.tools_mock", "register"),
+        ("app.plugins.customer_registration_tools", "register"),
+        ("app.plugins.appointments_tools", "register"),
+    ]
+
     tools: List[Tool] = []
-    tools.extend(register_mock_tools())
-    tools.extend(register_customer_email_tools())
-    tools.extend(register_appointments_tools())
-    return tools
\ No newline at end of file
+    for module_name, fn_name in registrars:
+        try:
+            module = __import__(module_name, fromlist=[fn_name])
+            tools.extend(getattr(module, fn_name)())
+        except ImportError as e:
+            log_event("tools_provider_skip", module=module_name, error=str(e))
+    return tools
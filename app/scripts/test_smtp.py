@@ -23,12 +23,27 @@ msg["To"] = to
 msg["Subject"] = "Test Gmail SMTP desde Python"
 msg.set_content("Si recibís esto, tu SMTP está OK.")
 
-with smtplib.SMTP(host, port, timeout=20) as s:
-    s.set_debuglevel(1)  # opcional: muestra el diálogo SMTP
-    s.ehlo()
-    s.starttls()
-    s.ehlo()
-    s.login(user, password)
-    s.send_message(msg)
+def _send(msg: EmailMessage) -> None:
+    debug = os.getenv("SMTP_DEBUG", "0") == "1"
+    use_ssl = port == 465 or os.getenv("SMTP_USE_SSL", "0") == "1"
 
+    if use_ssl:
+        # TLS implícito (ej: Gmail 465): ahorra el round-trip de STARTTLS
+        with smtplib.SMTP_SSL(host, port, timeout=20) as s:
+            if debug:
+                s.set_debuglevel(1)
+            s.login(user, password)
+            s.send_message(msg)
+    else:
+        with smtplib.SMTP(host, port, timeout=20) as s:
+            if debug:
+                s.set_debuglevel(1)  # opcional: muestra el diálogo SMTP
+            s.ehlo()
+            s.starttls()
+            s.ehlo()
+            s.login(user, password)
+            s.send_message(msg)
+
+
+_send(msg)
 print("OK: enviado")
\ No newline at end of file
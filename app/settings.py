@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -32,10 +34,17 @@ class Settings(BaseSettings):
     OLLAMA_MODEL: str = Field(default="gpt-oss:120b")
     OLLAMA_TIMEOUT_SEC: int = Field(default=30)
     OLLAMA_RETRIES: int = Field(default=2)
+    OLLAMA_MAX_CONNECTIONS: int = Field(default=64, description="HTTP pool size for the Ollama client")
+    OLLAMA_MAX_CONCURRENT: int = Field(default=16, description="Max simultaneous chat calls to Ollama")
 
     # Agent behavior
     ENABLE_ANSWERER: bool = Field(default=True)
     EXPOSE_DEBUG: bool = Field(default=True, description="Return debug payloads in dev")
+    TOOL_CONCURRENCY_LIMIT: int = Field(default=4, description="Max parallel read-tool executions per request")
+    SKIP_ANSWERER_CONFIDENCE: float = Field(
+        default=0.8,
+        description="If the plan brings final and confidence >= this, reuse it and skip the answerer LLM call",
+    )
 
     # Plugins
     TOOLS_PROVIDER: str = Field(default="app.plugins.tools_provider:provide_tools")  # ✅ CAMBIO
@@ -43,6 +52,10 @@ class Settings(BaseSettings):
 
     # Dedupe/session
     DEDUPE_TTL_SEC: int = Field(default=3600)
+    DEDUPE_TRUST_LOCAL_BLOOM: bool = Field(
+        default=False,
+        description="Single-process only: trust the local bloom on first sight and persist the mark in background",
+    )
     SESSION_TTL_SEC: int = Field(default=86400)
 
     CONFIRMATION_TTL_SEC: int = 1800  # 30 minutos (ej)
@@ -56,6 +69,14 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str | None = Field(default=None)
 
+    # Pool de conexiones. DB_PRE_PING=False si hay un pooler delante
+    # (ProxySQL y similares): ahí el SELECT 1 por checkout es puro overhead.
+    DB_PRE_PING: bool = Field(default=True)
+    DB_BOOTSTRAP: bool = Field(default=True, description="Run idempotent DDL bootstrap on startup (disable if schema is managed externally)")
+    DB_RECYCLE_SEC: int = Field(default=1800)
+    DB_POOL_SIZE: int = Field(default=10)
+    DB_MAX_OVERFLOW: int = Field(default=20)
+
     # Rate limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_IP_MAX: int = 60
@@ -71,4 +92,13 @@ class Settings(BaseSettings):
     SMTP_FROM: str = Field(default="")
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Instancia única: parsear .env y construir el modelo no se repite por
+    caller (útil como dependency de FastAPI sin costo por request).
+    """
+    return Settings()
+
+
+settings = get_settings()
\ No newline at end of file
@@ -0,0 +1,27 @@
+import time
+
+from app.agent.confirmations import ConfirmationManager
+
+
+def test_create_consume_roundtrip():
+    mgr = ConfirmationManager(ttl_sec=60)
+    token = mgr.create("sess1", "create_ticket", {"title": "t"})
+    item = mgr.consume(token, "sess1")
+    assert item is not None
+    assert item.tool_name == "create_ticket"
+    # consumido: no se puede volver a usar
+    assert mgr.consume(token, "sess1") is None
+
+
+def test_cleanup_removes_only_expired(monkeypatch):
+    mgr = ConfirmationManager(ttl_sec=60)
+    t_live = mgr.create("sess1", "create_ticket", {})
+    t_dead = mgr.create("sess1", "create_ticket", {}, ttl_sec=1)
+
+    # avanzar el reloj más allá del TTL corto
+    future = time.time() + 5
+    monkeypatch.setattr(time, "time", lambda: future)
+
+    mgr.cleanup()
+    assert mgr.consume(t_dead, "sess1") is None
+    assert mgr.consume(t_live, "sess1") is not None
@@ -1,4 +1,4 @@
-from app.agent.schema import PlannerOutput
+from app.agent.schema import PLANNER_OUTPUT_ADAPTER
 
 
 def test_planner_schema_valid_minimal():
@@ -10,7 +10,7 @@ def test_planner_schema_valid_minimal():
         "final": "Hola, ¿en qué puedo ayudarte?",
         "confidence": 0.8,
     }
-    model = PlannerOutput.model_validate(obj)
+    model = PLANNER_OUTPUT_ADAPTER.validate_python(obj)
     assert model.intent == "faq"
     assert model.final is not None
     assert 0 <= model.confidence <= 1
@@ -25,6 +25,6 @@ def test_planner_schema_missing_no_tools():
         "final": None,
         "confidence": 0.4,
     }
-    model = PlannerOutput.model_validate(obj)
+    model = PLANNER_OUTPUT_ADAPTER.validate_python(obj)
     assert "cliente_ref" in model.missing
     assert model.tool_calls == []
\ No newline at end of file